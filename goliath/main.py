@@ -24,12 +24,14 @@ from __future__ import annotations
 import base64
 import datetime as dt
 import hashlib
+import heapq
 import html
 import json
 import logging
 import os
 import random
 import re
+import string
 import sys
 import time
 # URL正規化（utm除去・末尾スラッシュ統一）
@@ -51,12 +53,28 @@ def norm_url(u: str) -> str:
     except Exception:
         return u.rstrip("/")
 
-from dataclasses import dataclass
-from typing import Any, Dict, Iterable, List, Optional, Tuple
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from functools import lru_cache
+from operator import itemgetter
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
 from urllib.error import HTTPError, URLError
 from urllib.parse import quote, urlencode, urlparse
 from urllib.request import Request, urlopen
 
+# Optional: faster JSON (falls back to stdlib json)
+try:
+    import orjson
+except Exception:
+    orjson = None
+
+# Optional: pooled keep-alive HTTP (falls back to urllib)
+try:
+    import requests
+except Exception:
+    requests = None
+
 
 # =============================================================================
 # Config (ENV)
@@ -127,6 +145,9 @@ LAST_SEEN_PATH = os.path.join(STATE_DIR, "last_seen.json")
 GOLIATH_DIR = os.path.join(REPO_ROOT, "goliath")
 PAGES_DIR = os.path.join(GOLIATH_DIR, "pages")
 OUT_DIR = os.path.join(GOLIATH_DIR, "_out")  # safe outputs (sitemap/robots/issues payload, etc.)
+# separator-terminated prefixes for per-page paths built in the site loop
+REPO_ROOT_PREFIX = os.path.join(REPO_ROOT, "")
+PAGES_DIR_PREFIX = os.path.join(PAGES_DIR, "")
 
 POLICIES_DIR = os.path.join(REPO_ROOT, "policies")  # allowed by your rule (new folder)
 HUB_DIR = os.path.join(REPO_ROOT, "hub")
@@ -300,20 +321,63 @@ def read_text(path: str) -> str:
 
 def write_text(path: str, content: str) -> None:
     os.makedirs(os.path.dirname(path), exist_ok=True)
-    with open(path, "w", encoding="utf-8", newline="\n") as f:
-        f.write(content)
+    # encode once and write the bytes in one call (binary mode: "\n" is kept as-is)
+    data = content.encode("utf-8")
+    with open(path, "wb") as f:
+        f.write(data)
+
+
+# Deferred page writes (path -> content). build_sites queues every file it
+# renders and flushes them together once the loop is done; a later write to
+# the same path replaces the earlier one, same as sequential write_text.
+_PENDING_WRITES: Dict[str, str] = {}
+
+
+def queue_write(path: str, content: str) -> None:
+    _PENDING_WRITES[path] = content
+
+
+def flush_pending_writes(max_workers: int = 8) -> int:
+    if not _PENDING_WRITES:
+        return 0
+    pending = list(_PENDING_WRITES.items())
+    _PENDING_WRITES.clear()
+    for d in {os.path.dirname(path) for path, _ in pending}:
+        os.makedirs(d, exist_ok=True)
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(pending))) as ex:
+        # list() so any write error is raised here
+        list(ex.map(lambda pc: write_text(pc[0], pc[1]), pending))
+    return len(pending)
+
+
+def json_loads(s: Any) -> Any:
+    if orjson is not None:
+        return orjson.loads(s)
+    return json.loads(s)
 
 
 def read_json(path: str, default: Any = None) -> Any:
     if not os.path.exists(path):
         return default
-    with open(path, "r", encoding="utf-8") as f:
-        return json.load(f)
+    with open(path, "rb") as f:
+        return json_loads(f.read())
 
 
 def write_json(path: str, obj: Any) -> None:
+    """Same layout as json.dumps(obj, ensure_ascii=False, indent=2), UTF-8."""
     os.makedirs(os.path.dirname(path), exist_ok=True)
-    with open(path, "w", encoding="utf-8", newline="\n") as f:
+    if orjson is not None:
+        try:
+            data = orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+        except TypeError:
+            # e.g. ints beyond 64 bit; let stdlib handle it
+            data = None
+        if data is not None:
+            with open(path, "wb") as f:
+                f.write(data)
+            return
+    # stdlib: json.dump streams iterencode() chunks, so the whole document is never held as one str
+    with open(path, "w", encoding="utf-8", newline="") as f:
         json.dump(obj, f, ensure_ascii=False, indent=2)
 
 BAD_AUTHOR_VALUES = {"", "unknown", "n/a", "na", "?"}
@@ -406,15 +470,41 @@ def now_iso() -> str:
     return dt.datetime.now(dt.timezone.utc).astimezone().isoformat(timespec="seconds")
 
 
+def epoch_to_iso(ts: float) -> str:
+    """
+    Same output as datetime.fromtimestamp(ts, utc).astimezone().isoformat(timespec="seconds"),
+    via time.localtime/strftime (no aware-datetime construction per call).
+    """
+    s = time.strftime("%Y-%m-%dT%H:%M:%S%z", time.localtime(ts))
+    return f"{s[:-2]}:{s[-2:]}"
+
+
+# Set once at the start of main(); everything written by one run shares it
+# (like RUN_ID). Collectors keep now_iso() for per-post fallbacks.
+RUN_TIMESTAMP = ""
+
+
+def run_iso() -> str:
+    return RUN_TIMESTAMP or now_iso()
+
+
 def sha1(s: str) -> str:
     return hashlib.sha1(s.encode("utf-8")).hexdigest()
 
 
+_WS_RE = re.compile(r"\s+")
+_SCHEME_RE = re.compile(r"https?://")
+_NON_ALNUM_RE = re.compile(r"[^a-z0-9]+")
+_DASHES_RE = re.compile(r"-{2,}")
+_HTML_TAG_RE = re.compile(r"<[^>]+>")
+_URI_RKEY_RE = re.compile(r"/([^/]+)$")
+
+
 def safe_slug(s: str, maxlen: int = 64) -> str:
     s = (s or "").strip().lower()
-    s = re.sub(r"https?://", "", s)
-    s = re.sub(r"[^a-z0-9]+", "-", s)
-    s = re.sub(r"-{2,}", "-", s).strip("-")
+    s = _SCHEME_RE.sub("", s)
+    s = _NON_ALNUM_RE.sub("-", s)
+    s = _DASHES_RE.sub("-", s).strip("-")
     if not s:
         s = "tool"
     return (s[:maxlen].strip("-") or "tool")
@@ -424,14 +514,9 @@ def clamp(n: int, lo: int, hi: int) -> int:
     return max(lo, min(hi, n))
 
 
-def uniq_keep_order(items: List[str]) -> List[str]:
-    seen = set()
-    out: List[str] = []
-    for x in items:
-        if x not in seen:
-            out.append(x)
-            seen.add(x)
-    return out
+def uniq_keep_order(items: Iterable[str]) -> List[str]:
+    # dicts keep insertion order, so fromkeys is an ordered dedup done in C
+    return list(dict.fromkeys(items))
 
 
 def is_frozen_path(path: str) -> bool:
@@ -445,28 +530,70 @@ def is_frozen_path(path: str) -> bool:
     return False
 
 
-def http_get(url: str, headers: Optional[Dict[str, str]] = None, timeout: int = 20) -> Tuple[int, str]:
-    h = dict(headers or {})
-    if "User-Agent" not in h:
-        h["User-Agent"] = DEFAULT_UA
+def _make_http_session():
+    if requests is None:
+        return None
+    sess = requests.Session()
+    # pool sized for the concurrent collectors; retry only connection-level failures
+    adapter = requests.adapters.HTTPAdapter(
+        pool_connections=8,
+        pool_maxsize=32,
+        max_retries=requests.adapters.Retry(total=2, backoff_factor=0.3),
+    )
+    sess.mount("https://", adapter)
+    sess.mount("http://", adapter)
+    return sess
+
+
+# One session for every collector call: repeated requests to the same host
+# (Reddit, Mastodon paging, ...) reuse the TCP/TLS connection.
+_HTTP_SESSION = _make_http_session()
+
+
+def http_get_bytes(url: str, headers: Optional[Dict[str, str]] = None, timeout: int = 20) -> Tuple[int, bytes]:
+    """
+    Raw response body; status 0 and the error text on connection failure.
+    `headers` is never mutated, so collectors can pass one dict for every call
+    (it is only copied when the default User-Agent has to be added).
+    """
+    h = headers if headers and "User-Agent" in headers else {**(headers or {}), "User-Agent": DEFAULT_UA}
+    if _HTTP_SESSION is not None:
+        try:
+            resp = _HTTP_SESSION.get(url, headers=h, timeout=timeout)
+        except requests.RequestException as e:
+            return 0, str(e).encode("utf-8")
+        return resp.status_code, resp.content
     req = Request(url, headers=h, method="GET")
     try:
         with urlopen(req, timeout=timeout) as resp:
-            status = resp.status
-            data = resp.read()
-            try:
-                text = data.decode("utf-8")
-            except UnicodeDecodeError:
-                text = data.decode("utf-8", errors="replace")
-            return status, text
+            return resp.status, resp.read()
     except HTTPError as e:
         try:
-            body = e.read().decode("utf-8", errors="replace")
+            body = e.read()
         except Exception:
-            body = ""
+            body = b""
         return e.code, body
     except URLError as e:
-        return 0, str(e)
+        return 0, str(e).encode("utf-8")
+
+
+def http_get(url: str, headers: Optional[Dict[str, str]] = None, timeout: int = 20) -> Tuple[int, str]:
+    st, data = http_get_bytes(url, headers=headers, timeout=timeout)
+    return st, data.decode("utf-8", errors="replace")
+
+
+def http_get_json(url: str, headers: Optional[Dict[str, str]] = None, timeout: int = 20) -> Tuple[int, Any, bytes]:
+    """
+    (status, parsed JSON or None, raw body). The body is parsed straight from
+    bytes, without a str round-trip; callers only decode it to log failures.
+    """
+    st, data = http_get_bytes(url, headers=headers, timeout=timeout)
+    if st != 200:
+        return st, None, data
+    try:
+        return st, json_loads(data), data
+    except Exception:
+        return st, None, data
 
 
 def http_post_json(
@@ -481,13 +608,23 @@ def http_post_json(
     if "User-Agent" not in h:
         h["User-Agent"] = DEFAULT_UA
     data = json.dumps(payload).encode("utf-8")
+    if _HTTP_SESSION is not None:
+        try:
+            resp = _HTTP_SESSION.post(url, headers=h, data=data, timeout=timeout)
+        except requests.RequestException as e:
+            return 0, {}, str(e)
+        raw = resp.content.decode("utf-8", errors="replace")
+        try:
+            return resp.status_code, json_loads(raw), raw
+        except Exception:
+            return resp.status_code, {}, raw
     req = Request(url, headers=h, data=data, method="POST")
     try:
         with urlopen(req, timeout=timeout) as resp:
             status = resp.status
             raw = resp.read().decode("utf-8", errors="replace")
             try:
-                return status, json.loads(raw), raw
+                return status, json_loads(raw), raw
             except Exception:
                 return status, {}, raw
     except HTTPError as e:
@@ -497,13 +634,36 @@ def http_post_json(
         except Exception:
             pass
         try:
-            return e.code, json.loads(raw), raw
+            return e.code, json_loads(raw), raw
         except Exception:
             return e.code, {}, raw
     except URLError as e:
         return 0, {}, str(e)
 
 
+def fetch_in_waves(
+    fetch,
+    items: List[Any],
+    consume,
+    done,
+    wave: int = 6,
+) -> None:
+    """
+    Run fetch(item) concurrently, `wave` items at a time, and pass each result to
+    consume() in item order. No new wave is started once done() is true, so a
+    source that fills up early is not queried further (same as the old serial
+    loops that broke out on `len(out) >= target`).
+    """
+    if not items:
+        return
+    with ThreadPoolExecutor(max_workers=max(1, min(wave, len(items)))) as ex:
+        for i in range(0, len(items), wave):
+            if done():
+                break
+            for res in ex.map(fetch, items[i:i + wave]):
+                consume(res)
+
+
 def base64_basic_auth(user: str, password: str) -> str:
     token = f"{user}:{password}"
     return base64.b64encode(token.encode("utf-8")).decode("ascii")
@@ -527,23 +687,31 @@ BAN_WORDS_JA = [
     "自殺", "自傷",
 ]
 
+@lru_cache(maxsize=4096)
 def adult_or_sensitive(text: str) -> bool:
-    t = (text or "").lower()
+    # top-up passes re-fetch many of the same posts, so results are memoized per text;
+    # plain substring tests: measurably faster in CPython than one alternation regex
+    text = text or ""
+    t = text.lower()
     if any(w in t for w in BAN_WORDS):
         return True
-    if any(w in (text or "") for w in BAN_WORDS_JA):
+    if any(w in text for w in BAN_WORDS_JA):
         return True
     return False
 
 
+QUESTION_MARKERS = ("?", "how", "what", "which", "where", "when", "why", "help", "fix", "recommend", "best", "compare", "plan", "checklist")
+VENT_WORDS = ("hate", "tired", "annoying", "frustrated", "sad", "depressed", "angry", "worst", "sucks")
+
+
 def too_broad_vent(text: str) -> bool:
     """
     Downrank content that is mainly venting with no actionable question.
     """
     t = (text or "").lower()
     # if there is no question-like marker and mostly abstract emotion words
-    has_question = any(x in t for x in ["?", "how", "what", "which", "where", "when", "why", "help", "fix", "recommend", "best", "compare", "plan", "checklist"])
-    emo = sum(1 for x in ["hate", "tired", "annoying", "frustrated", "sad", "depressed", "angry", "worst", "sucks"] if x in t)
+    has_question = any(x in t for x in QUESTION_MARKERS)
+    emo = sum(1 for x in VENT_WORDS if x in t)
     if (not has_question) and emo >= 2:
         return True
     return False
@@ -562,11 +730,38 @@ class Post:
     created_at: str
     lang_hint: str = ""
     meta: Optional[Dict[str, Any]] = None
+    # norm_text() cache: clustering/keywords/category/score each re-read it per post
+    _norm: Optional[str] = field(default=None, init=False, repr=False, compare=False)
+
+    # dedup() key cache: collect_all re-dedups the whole growing list after every top-up
+    _dedup_key: Optional[Tuple[str, ...]] = field(default=None, init=False, repr=False, compare=False)
+    # simple_tokenize(norm_text()) cache: clustering and keyword extraction both need it
+    _tokens: Optional[List[str]] = field(default=None, init=False, repr=False, compare=False)
+    _token_set: Optional[frozenset] = field(default=None, init=False, repr=False, compare=False)
 
     def norm_text(self) -> str:
-        t = self.text or ""
-        t = re.sub(r"\s+", " ", t).strip()
-        return t
+        if self._norm is None:
+            t = self.text or ""
+            self._norm = _WS_RE.sub(" ", t).strip()
+        return self._norm
+
+    def tokens(self) -> List[str]:
+        if self._tokens is None:
+            self._tokens = simple_tokenize(self.norm_text())
+        return self._tokens
+
+    def token_set(self) -> frozenset:
+        # interned tokens: identical strings across posts share one object, so set
+        # intersections in cluster_posts hit the identity fast path on equality
+        if self._token_set is None:
+            self._token_set = frozenset(sys.intern(t) for t in self.tokens())
+        return self._token_set
+
+    def dedup_key(self) -> Tuple[str, ...]:
+        if self._dedup_key is None:
+            url = norm_url(self.url or "")
+            self._dedup_key = ("url", url) if url else ("id", self.source, self.id)
+        return self._dedup_key
 
 
 @dataclass
@@ -598,6 +793,10 @@ KEYWORDS = [
     "move", "declutter", "cleaning", "laundry",
 ]
 
+# lower-cased once for the collect_reddit trigger screen. Plain substring tests
+# beat a compiled alternation here: re tries every branch at each position.
+KEYWORDS_LOWER: Tuple[str, ...] = tuple(k.lower() for k in KEYWORDS)
+
 def collect_bluesky(max_items: int = 60) -> List[Post]:
     """
     ATProto:
@@ -629,7 +828,7 @@ def collect_bluesky(max_items: int = 60) -> List[Post]:
 
     # Prefer authenticated session (more stable + may yield more)
     use_public = False
-    headers = {"Accept": "application/json"}
+    headers = {"Accept": "application/json", "User-Agent": DEFAULT_UA}
     base = "https://bsky.social"
 
     if BLUESKY_HANDLE and BLUESKY_APP_PASSWORD:
@@ -654,24 +853,25 @@ def collect_bluesky(max_items: int = 60) -> List[Post]:
 
     if use_public:
         base = "https://public.api.bsky.app"
-        headers = {"Accept": "application/json"}
+        headers = {"Accept": "application/json", "User-Agent": DEFAULT_UA}
         logging.info("Bluesky: using public endpoint (no credentials/session). collecting up to %d", target)
 
     bsky_state = {"public_blocked": False, "public_block_warned": False}
+    # per-collector constants shared by every search() call
+    have_auth = "Authorization" in headers
+    public_bases = ["https://public.api.bsky.app", "https://api.bsky.app"]
+    auth_bases = ["https://bsky.social"]
+    bases = (auth_bases + public_bases) if have_auth else public_bases
+    pub_headers = {"Accept": "application/json", "User-Agent": DEFAULT_UA}
+
     def search(q: str, limit: int) -> List[Post]:
         if not q:
             return []
         limit = max(1, min(int(limit), 100))
-        have_auth = "Authorization" in headers
-        public_bases = ["https://public.api.bsky.app", "https://api.bsky.app"]
-        auth_bases = ["https://bsky.social"]
 
         if (not have_auth) and bsky_state.get("public_blocked"):
             return []
 
-        bases = (auth_bases + public_bases) if have_auth else public_bases
-        pub_headers = {"Accept": "application/json"}
-
         body = ""
         st = 0
         used_base = ""
@@ -695,7 +895,7 @@ def collect_bluesky(max_items: int = 60) -> List[Post]:
                 bsky_state["public_block_warned"] = True
             return []
         try:
-            data = json.loads(body)
+            data = json_loads(body)
         except Exception:
             return []
         posts = data.get("posts") or []
@@ -712,7 +912,7 @@ def collect_bluesky(max_items: int = 60) -> List[Post]:
                 # best-effort: convert uri -> bsky.app url
                 if uri:
                     # at://did/app.bsky.feed.post/<rkey>
-                    m = re.search(r"/([^/]+)$", uri)
+                    m = _URI_RKEY_RE.search(uri)
                     rkey = m.group(1) if m else ""
                     if author and rkey:
                         urlp = f"https://bsky.app/profile/{author}/post/{rkey}"
@@ -747,25 +947,17 @@ def collect_bluesky(max_items: int = 60) -> List[Post]:
             seen_ids.add(p.id)
             out.append(p)
 
-    # 1) narrow
-    for q in queries_narrow:
-        if len(out) >= target:
-            break
-        add_many(search(q, limit=min(100, target - len(out))))
+    def search_page(q: str) -> List[Post]:
+        return search(q, limit=min(100, target))
 
-    # 2) wide
-    if len(out) < target:
-        for q in queries_wide:
-            if len(out) >= target:
-                break
-            add_many(search(q, limit=min(100, target - len(out))))
+    def full() -> bool:
+        return len(out) >= target
 
-    # 3) very wide (last resort)
-    if len(out) < target:
-        for q in queries_very_wide:
-            if len(out) >= target:
-                break
-            add_many(search(q, limit=min(100, target - len(out))))
+    # narrow -> wide -> very wide (last resort); queries within a stage run concurrently
+    for queries in (queries_narrow, queries_wide, queries_very_wide):
+        if full():
+            break
+        fetch_in_waves(search_page, queries, add_many, full)
 
     logging.info("Bluesky: collected %d", len(out))
     return out
@@ -786,7 +978,7 @@ def collect_mastodon(max_items: int = 120) -> List[Post]:
         return []
 
     base = (MASTODON_BASE or "https://mastodon.social").rstrip("/")
-    headers = {"Accept": "application/json"}
+    headers = {"Accept": "application/json", "User-Agent": DEFAULT_UA}
     if MASTODON_TOKEN:
         headers["Authorization"] = f"Bearer {MASTODON_TOKEN}"
 
@@ -820,9 +1012,9 @@ def collect_mastodon(max_items: int = 120) -> List[Post]:
                 sid = str(s.get("id") or "")
                 url = s.get("url") or ""
                 content = s.get("content") or ""
-                # strip html tags (cheap)
-                content_txt = re.sub(r"<[^>]+>", " ", content)
-                content_txt = re.sub(r"\s+", " ", content_txt).strip()
+                # strip html tags (cheap; plain-text statuses skip the regex)
+                content_txt = _HTML_TAG_RE.sub(" ", content) if "<" in content else content
+                content_txt = _WS_RE.sub(" ", content_txt).strip()
                 if not content_txt:
                     continue
                 author = ((s.get("account") or {}).get("acct") or "").strip()
@@ -845,13 +1037,7 @@ def collect_mastodon(max_items: int = 120) -> List[Post]:
                 continue
 
     def get_json(url: str) -> Any:
-        st, body = http_get(url, headers=headers, timeout=20)
-        if st != 200:
-            return None
-        try:
-            return json.loads(body)
-        except Exception:
-            return None
+        return http_get_json(url, headers=headers, timeout=20)[1]
 
     # 1) public timeline (paged)
     max_id = None
@@ -872,47 +1058,49 @@ def collect_mastodon(max_items: int = 120) -> List[Post]:
         if not max_id:
             break
 
+    def full() -> bool:
+        return len(out) >= target
+
+    def add_fetched(res: Tuple[str, Any]) -> None:
+        via, statuses = res
+        if isinstance(statuses, list):
+            add_statuses(statuses, via)
+
     # 2) tags
-    for tag in tags:
-        if len(out) >= target:
-            break
-        url = f"{base}/api/v1/timelines/tag/{quote(tag)}?limit=30"
-        data = get_json(url)
-        if isinstance(data, list):
-            add_statuses(data, f"tag:{tag}")
+    def fetch_tag(tag: str) -> Tuple[str, Any]:
+        return f"tag:{tag}", get_json(f"{base}/api/v1/timelines/tag/{quote(tag)}?limit=30")
+
+    fetch_in_waves(fetch_tag, tags, add_fetched, full)
 
     # 3) search (narrow then wide)
-    def search_q(q: str) -> None:
-        if len(out) >= target:
-            return
-        if not q:
-            return
+    def fetch_search(q: str) -> Tuple[str, Any]:
         url = f"{base}/api/v2/search?" + urlencode({"q": q, "type": "statuses", "resolve": "true", "limit": "30"})
         data = get_json(url)
-        if not isinstance(data, dict):
-            return
-        statuses = data.get("statuses") or []
-        if isinstance(statuses, list):
-            add_statuses(statuses, f"search:{q}")
+        return f"search:{q}", (data.get("statuses") or []) if isinstance(data, dict) else None
 
-    for q in queries_narrow:
-        if len(out) >= target:
-            break
-        search_q(q)
+    def search_all(queries: List[str]) -> None:
+        fetch_in_waves(fetch_search, [q for q in queries if q], add_fetched, full)
+
+    search_all(queries_narrow)
 
     if len(out) == 0:
-        for q in queries_wide:
-            if len(out) >= target:
-                break
-            search_q(q)
+        search_all(queries_wide)
 
     logging.info("Mastodon: collected %d", len(out))
     return out[:target]
 
 
+# (access_token, expires_at epoch): collect_reddit runs again for every top-up pass
+_REDDIT_TOKEN: Tuple[str, float] = ("", 0.0)
+
+
 def reddit_oauth_token() -> Optional[str]:
+    global _REDDIT_TOKEN
     if not (REDDIT_CLIENT_ID and REDDIT_CLIENT_SECRET and REDDIT_REFRESH_TOKEN):
         return None
+    cached, expires_at = _REDDIT_TOKEN
+    if cached and time.time() < expires_at:
+        return cached
 
     token_url = "https://www.reddit.com/api/v1/access_token"
     basic = "Basic " + base64_basic_auth(REDDIT_CLIENT_ID, REDDIT_CLIENT_SECRET)
@@ -923,15 +1111,30 @@ def reddit_oauth_token() -> Optional[str]:
         "Accept": "application/json",
     }
     form = urlencode({"grant_type": "refresh_token", "refresh_token": REDDIT_REFRESH_TOKEN}).encode("utf-8")
-    req = Request(token_url, headers=headers, data=form, method="POST")
     try:
-        with urlopen(req, timeout=20) as resp:
-            raw = resp.read().decode("utf-8", errors="replace")
-            js = json.loads(raw)
-            return js.get("access_token")
+        if _HTTP_SESSION is not None:
+            # same connection pool as the oauth.reddit.com reads that follow
+            resp = _HTTP_SESSION.post(token_url, headers=headers, data=form, timeout=20)
+            resp.raise_for_status()
+            js = json_loads(resp.content)
+        else:
+            req = Request(token_url, headers=headers, data=form, method="POST")
+            with urlopen(req, timeout=20) as resp:
+                js = json_loads(resp.read())
     except Exception as e:
         logging.warning("Reddit: oauth token failed: %s", str(e))
         return None
+    if not isinstance(js, dict):
+        return None
+    token = js.get("access_token")
+    if token:
+        # refresh a minute early
+        ttl = float(js.get("expires_in") or 0) - 60
+        _REDDIT_TOKEN = (token, time.time() + ttl) if ttl > 0 else ("", 0.0)
+    return token
+
+
+_REDDIT_FIELDS = ("title", "selftext", "permalink", "url", "author", "created_utc", "name", "id")
 
 
 def collect_reddit(max_items: int = 60) -> List[Post]:
@@ -954,35 +1157,34 @@ def collect_reddit(max_items: int = 60) -> List[Post]:
         headers = {"User-Agent": REDDIT_USER_AGENT, "Accept": "application/json"}
         logging.info("Reddit: public mode collecting up to %d", max_items)
 
-    triggers = [k.lower() for k in KEYWORDS]
     out: List[Post] = []
 
-    for sub in subs:
-        if len(out) >= max_items:
-            break
-
-        st, body = http_get(f"{base}/r/{quote(sub)}/new.json?limit=50", headers=headers, timeout=20)
-        if st != 200:
-            continue
-
-        try:
-            data = json.loads(body)
-        except Exception:
-            continue
-
+    def fetch_sub(sub: str) -> Tuple[str, List[Dict[str, Any]]]:
+        data = http_get_json(f"{base}/r/{quote(sub)}/new.json?limit=50", headers=headers, timeout=20)[1]
         children = (((data or {}).get("data") or {}).get("children") or [])
-        for ch in children:
+        # keep only the fields we read; the full listing (50 submissions with
+        # selftext and media metadata) is dropped before the next wave is fetched
+        return sub, [
+            {f: d.get(f) for f in _REDDIT_FIELDS}
+            for d in (((ch or {}).get("data") or {}) for ch in children)
+        ]
+
+    def add_sub(res: Tuple[str, List[Dict[str, Any]]]) -> None:
+        sub, slim = res
+        for d in slim:
             if len(out) >= max_items:
                 break
-            d = (ch or {}).get("data") or {}
             title = (d.get("title") or "").strip()
             selftext = (d.get("selftext") or "").strip()
-            text = (title + "\n" + selftext).strip()
-            if not text or adult_or_sensitive(text):
+            if not title and not selftext:
+                continue
+            # both parts are already stripped; only join when both exist
+            text = f"{title}\n{selftext}" if title and selftext else (title or selftext)
+            if adult_or_sensitive(text):
                 continue
 
             low = text.lower()
-            if not any(t in low for t in triggers):
+            if not any(t in low for t in KEYWORDS_LOWER):
                 continue
 
             permalink = (d.get("permalink") or "").strip()
@@ -992,7 +1194,7 @@ def collect_reddit(max_items: int = 60) -> List[Post]:
 
             author = (d.get("author") or "unknown").strip()
             created_utc = d.get("created_utc") or time.time()
-            created_at = dt.datetime.fromtimestamp(float(created_utc), tz=dt.timezone.utc).astimezone().isoformat(timespec="seconds")
+            created_at = epoch_to_iso(float(created_utc))
             rid = d.get("name") or d.get("id") or sha1(url)
 
             pid = sha1(f"reddit:{rid}:{url}")
@@ -1006,6 +1208,8 @@ def collect_reddit(max_items: int = 60) -> List[Post]:
                 meta={"subreddit": sub},
             ))
 
+    fetch_in_waves(fetch_sub, subs, add_sub, lambda: len(out) >= max_items)
+
     logging.info("Reddit: collected %d", len(out))
     return out
 
@@ -1015,30 +1219,38 @@ def collect_hn(max_items: int = 70) -> List[Post]:
     Hacker News (Algolia search_by_date for help-like content)
     """
     max_items = clamp(max_items, 10, 200)
-    url = "https://hn.algolia.com/api/v1/search_by_date?" + urlencode({
-        "query": HN_QUERY,
-        "tags": "story,comment",
-        "hitsPerPage": str(min(max_items, 100)),
-        "page": "0",
-    })
-    st, body = http_get(url, headers={"Accept": "application/json"}, timeout=20)
-    if st != 200:
-        logging.warning("HN: failed status=%s body=%s", st, (body or "")[:200])
-        return []
+    per_page = min(max_items, 100)
+    # Algolia caps hitsPerPage at 100: fetch every page needed for max_items together
+    pages = list(range((max_items + per_page - 1) // per_page))
+
+    def fetch_page(page: int) -> List[Dict[str, Any]]:
+        url = "https://hn.algolia.com/api/v1/search_by_date?" + urlencode({
+            "query": HN_QUERY,
+            "tags": "story,comment",
+            "hitsPerPage": str(per_page),
+            "page": str(page),
+        })
+        st, data, body = http_get_json(url, headers={"Accept": "application/json"}, timeout=20)
+        if st != 200:
+            logging.warning("HN: failed status=%s body=%s", st, body[:200].decode("utf-8", errors="replace"))
+            return []
+        if data is None:
+            return []
+        return data.get("hits", []) or []
 
-    try:
-        data = json.loads(body)
-    except Exception:
-        return []
+    hits: List[Dict[str, Any]] = []
+    fetch_in_waves(fetch_page, pages, hits.extend, lambda: False)
 
-    hits = data.get("hits", []) or []
     out: List[Post] = []
     for h in hits:
         if len(out) >= max_items:
             break
         text = (h.get("title") or "") + "\n" + (h.get("comment_text") or "")
-        text = re.sub(r"<[^>]+>", " ", text)
-        text = html.unescape(text).strip()
+        if "<" in text:
+            text = _HTML_TAG_RE.sub(" ", text)
+        if "&" in text:
+            text = html.unescape(text)
+        text = text.strip()
         if not text or adult_or_sensitive(text):
             continue
 
@@ -1106,7 +1318,7 @@ def collect_x_mentions(max_items: int = 1) -> List[Post]:
         return []
 
     max_items = 1  # 強制：1件だけ採用
-    headers = {"Authorization": f"Bearer {X_BEARER_TOKEN}", "Accept": "application/json"}
+    headers = {"Authorization": f"Bearer {X_BEARER_TOKEN}", "Accept": "application/json", "User-Agent": DEFAULT_UA}
 
     # クエリ（未指定なら省エネの固定クエリ）
     q = (X_QUERY or '("how to" OR help OR error OR failed OR bug OR fix) -is:retweet -is:reply').strip()
@@ -1118,14 +1330,11 @@ def collect_x_mentions(max_items: int = 1) -> List[Post]:
         "tweet.fields": "created_at,lang,author_id",
     })
 
-    st, body = http_get(url, headers=headers, timeout=20)
+    st, data, body = http_get_json(url, headers=headers, timeout=20)
     if st != 200:
-        logging.warning("X: search failed status=%s body=%s", st, (body or "")[:200])
+        logging.warning("X: search failed status=%s body=%s", st, body[:200].decode("utf-8", errors="replace"))
         return []
-
-    try:
-        data = json.loads(body)
-    except Exception:
+    if data is None:
         return []
 
     tweets = data.get("data") or []
@@ -1192,12 +1401,18 @@ this that these those it its i'm youre you're we they them our your my mine me y
 
 STOPWORDS_JA = set(["これ", "それ", "あれ", "ため", "ので", "から", "です", "ます", "いる", "ある", "なる", "こと", "もの", "よう", "へ", "に", "を", "が", "と", "で", "も"])
 
+_TOKEN_URL_RE = re.compile(r"https?://\S+")
+_TOKEN_PUNCT_RE = re.compile(r"[\[\]()<>{}※*\"'`~^|\\]")
+_TOKEN_DROP_RE = re.compile(r"[^0-9a-z\u3040-\u30ff\u4e00-\u9fff\s\-_/.:]")
+_JP_CHUNK_RE = re.compile(r"[\u3040-\u30ff\u4e00-\u9fff]{2,}")
+
+
 def simple_tokenize(text: str) -> List[str]:
     t = (text or "").lower()
-    t = re.sub(r"https?://\S+", " ", t)
-    t = re.sub(r"[\[\]()<>{}※*\"'`~^|\\]", " ", t)
-    t = re.sub(r"[^0-9a-z\u3040-\u30ff\u4e00-\u9fff\s\-_/.:]", " ", t)
-    t = re.sub(r"\s+", " ", t).strip()
+    t = _TOKEN_URL_RE.sub(" ", t)
+    t = _TOKEN_PUNCT_RE.sub(" ", t)
+    t = _TOKEN_DROP_RE.sub(" ", t)
+    # no whitespace collapse needed: split() and the JP chunk regex both skip it
 
     parts: List[str] = []
     for p in t.split():
@@ -1208,28 +1423,52 @@ def simple_tokenize(text: str) -> List[str]:
         if p in STOPWORDS_JA:
             continue
         parts.append(p)
+        if len(parts) >= 100:
+            return parts
 
-    # crude JP chunks to help clustering without full tokenizer
-    jp_chunks = re.findall(r"[\u3040-\u30ff\u4e00-\u9fff]{2,}", t)
-    parts.extend([c for c in jp_chunks if c not in STOPWORDS_JA and len(c) >= 2])
+    # crude JP chunks to help clustering without full tokenizer (chunks are 2+ chars)
+    for m in _JP_CHUNK_RE.finditer(t):
+        c = m.group()
+        if c in STOPWORDS_JA:
+            continue
+        parts.append(c)
+        if len(parts) >= 100:
+            break
 
-    return parts[:100]
+    return parts
 
 
 def jaccard(a: set, b: set) -> float:
     if not a or not b:
         return 0.0
+    # |a ∪ b| from the intersection: one set allocation instead of two
     inter = len(a & b)
-    union = len(a | b)
-    return inter / union if union else 0.0
+    return inter / (len(a) + len(b) - inter)
+
 
+def post_token_sets(posts: List[Post]) -> Dict[str, frozenset]:
+    return {p.id: p.token_set() for p in posts}
 
-def cluster_posts(posts: List[Post], threshold: float = 0.22) -> List[List[Post]]:
+
+def cluster_posts(
+    posts: List[Post],
+    threshold: float = 0.22,
+    token_sets: Optional[Dict[str, frozenset]] = None,
+) -> List[List[Post]]:
     """
     Lightweight clustering by Jaccard similarity of token sets.
+    Pass token_sets (post_token_sets) when clustering the same posts repeatedly.
     """
     logging.info("Clustering %d posts (threshold=%.2f)", len(posts), threshold)
-    token_sets: Dict[str, set] = {p.id: set(simple_tokenize(p.norm_text())) for p in posts}
+    if token_sets is None:
+        token_sets = post_token_sets(posts)
+
+    # token -> positions of the posts containing it. A pair with no shared token
+    # has Jaccard 0, so only posts reachable through the base's tokens are compared.
+    postings: Dict[str, List[int]] = {}
+    for j, p in enumerate(posts):
+        for tok in token_sets[p.id]:
+            postings.setdefault(tok, []).append(j)
 
     clusters: List[List[Post]] = []
     used = set()
@@ -1239,12 +1478,26 @@ def cluster_posts(posts: List[Post], threshold: float = 0.22) -> List[List[Post]
             continue
         used.add(p.id)
         base = token_sets[p.id]
+        nb = len(base)
         c = [p]
-        for q in posts[i + 1:]:
+        if not nb:
+            clusters.append(c)
+            continue
+        # later posts sharing a token, in original order (greedy result depends on it)
+        cand = sorted({j for tok in base for j in postings[tok] if j > i})
+        for j in cand:
+            q = posts[j]
             if q.id in used:
                 continue
-            sim = jaccard(base, token_sets[q.id])
-            if sim >= threshold:
+            other = token_sets[q.id]
+            no = len(other)
+            # Jaccard can never exceed min/max of the set sizes: skip the
+            # intersection for pairs whose sizes are already too far apart.
+            # (conditional instead of min()/max() calls; same quotient)
+            if not no or (nb / no if nb < no else no / nb) < threshold:
+                continue
+            inter = len(base & other)
+            if inter / (nb + no - inter) >= threshold:
                 used.add(q.id)
                 c.append(q)
         clusters.append(c)
@@ -1255,12 +1508,45 @@ def cluster_posts(posts: List[Post], threshold: float = 0.22) -> List[List[Post]
 
 
 def extract_keywords(posts: List[Post], topk: int = 14) -> List[str]:
-    freq: Dict[str, int] = {}
+    freq: Counter = Counter()
     for p in posts:
-        for w in simple_tokenize(p.norm_text()):
-            freq[w] = freq.get(w, 0) + 1
-    items = sorted(freq.items(), key=lambda kv: (-kv[1], kv[0]))
-    return [k for k, _ in items[:topk]]
+        freq.update(p.tokens())
+    # only the top k are needed: partial selection instead of sorting every token
+    items = heapq.nsmallest(topk, freq.items(), key=lambda kv: (-kv[1], kv[0]))
+    return [k for k, _ in items]
+
+
+# Category signals in priority order: the first category with any signal word in the
+# cluster text (substring) or among its keywords (exact) wins.
+CATEGORY_SIGNALS: List[Tuple[str, Tuple[str, ...]]] = [
+    # tech
+    ("Web/Hosting", ("dns", "cname", "aaaa", "a record", "nameserver", "github pages", "hosting", "ssl", "https")),
+    ("Dev/Tools", ("python", "node", "npm", "pip", "powershell", "bash", "cli", "library", "compile", "stack", "trace", "dev")),
+    ("AI/Automation", ("automation", "workflow", "cron", "github actions", "llm", "openai", "prompt", "agent")),
+    ("Security/Privacy", ("privacy", "security", "2fa", "phishing", "cookie", "vpn", "encryption", "leak")),
+    ("Media", ("video", "mp4", "compress", "codec", "ffmpeg", "audio", "subtitle")),
+    ("PDF/Docs", ("pdf", "docx", "ppt", "docs", "word", "convert", "merge", "compress pdf")),
+    ("Images/Design", ("image", "png", "jpg", "webp", "design", "figma", "photoshop", "illustrator")),
+    ("Data/Spreadsheets", ("excel", "spreadsheet", "csv", "google sheets", "vlookup", "pivot", "formula")),
+    ("Business/Accounting/Tax", ("invoice", "tax", "accounting", "bookkeeping", "receipt", "vat")),
+    ("Marketing/Social", ("seo", "marketing", "ads", "social", "instagram", "tiktok", "youtube", "growth")),
+    ("Productivity", ("productivity", "todo", "note", "calendar", "time management", "procrastination", "focus")),
+    ("Education/Language", ("english", "language", "toeic", "eiken", "ielts")),
+    # life
+    ("Travel/Planning", ("travel", "trip", "hotel", "itinerary", "flight", "booking", "layover", "packing", "esim")),
+    ("Food/Cooking", ("recipe", "cook", "cooking", "meal prep", "kitchen", "grocery")),
+    ("Health/Fitness", ("workout", "fitness", "diet", "health", "running", "sleep", "calories", "protein")),
+    ("Study/Learning", ("study", "learning", "exam", "homework", "memorize", "flashcards")),
+    ("Money/Personal Finance", ("money", "budget", "loan", "invest", "stock", "fees", "refund")),
+    ("Career/Work", ("career", "job", "resume", "cv", "interview", "apply")),
+    ("Relationships/Communication", ("relationship", "communication", "friend", "chat", "texting", "awkward")),
+    ("Home/Life Admin", ("home", "rent", "utility", "life admin", "paperwork", "moving", "declutter", "cleaning")),
+    ("Shopping/Products", ("buy", "shopping", "product", "recommend", "compare", "best", "value")),
+    ("Events/Leisure", ("event", "ticket", "concert", "sports", "weekend plan", "date plan", "rainy day")),
+]
+_CATEGORY_SIGNAL_SETS: List[Tuple[str, Tuple[str, ...], frozenset]] = [
+    (cat, words, frozenset(words)) for cat, words in CATEGORY_SIGNALS
+]
 
 
 def choose_category(posts: List[Post], keywords: List[str]) -> str:
@@ -1270,58 +1556,38 @@ def choose_category(posts: List[Post], keywords: List[str]) -> str:
     text = " ".join([p.norm_text() for p in posts]).lower()
     k = set([x.lower() for x in keywords])
 
-    def has_any(words: List[str]) -> bool:
-        return any(w in text for w in words) or any(w in k for w in words)
+    for cat, words, word_set in _CATEGORY_SIGNAL_SETS:
+        if any(w in text for w in words) or not word_set.isdisjoint(k):
+            return cat
 
-    # tech
-    if has_any(["dns", "cname", "aaaa", "a record", "nameserver", "github pages", "hosting", "ssl", "https"]):
-        return "Web/Hosting"
-    if has_any(["python", "node", "npm", "pip", "powershell", "bash", "cli", "library", "compile", "stack", "trace", "dev"]):
-        return "Dev/Tools"
-    if has_any(["automation", "workflow", "cron", "github actions", "llm", "openai", "prompt", "agent"]):
-        return "AI/Automation"
-    if has_any(["privacy", "security", "2fa", "phishing", "cookie", "vpn", "encryption", "leak"]):
-        return "Security/Privacy"
-    if has_any(["video", "mp4", "compress", "codec", "ffmpeg", "audio", "subtitle"]):
-        return "Media"
-    if has_any(["pdf", "docx", "ppt", "docs", "word", "convert", "merge", "compress pdf"]):
-        return "PDF/Docs"
-    if has_any(["image", "png", "jpg", "webp", "design", "figma", "photoshop", "illustrator"]):
-        return "Images/Design"
-    if has_any(["excel", "spreadsheet", "csv", "google sheets", "vlookup", "pivot", "formula"]):
-        return "Data/Spreadsheets"
-    if has_any(["invoice", "tax", "accounting", "bookkeeping", "receipt", "vat"]):
-        return "Business/Accounting/Tax"
-    if has_any(["seo", "marketing", "ads", "social", "instagram", "tiktok", "youtube", "growth"]):
-        return "Marketing/Social"
-    if has_any(["productivity", "todo", "note", "calendar", "time management", "procrastination", "focus"]):
-        return "Productivity"
-    if has_any(["english", "language", "toeic", "eiken", "ielts"]):
-        return "Education/Language"
+    return "Dev/Tools"
 
-    # life
-    if has_any(["travel", "trip", "hotel", "itinerary", "flight", "booking", "layover", "packing", "esim"]):
-        return "Travel/Planning"
-    if has_any(["recipe", "cook", "cooking", "meal prep", "kitchen", "grocery"]):
-        return "Food/Cooking"
-    if has_any(["workout", "fitness", "diet", "health", "running", "sleep", "calories", "protein"]):
-        return "Health/Fitness"
-    if has_any(["study", "learning", "exam", "homework", "memorize", "flashcards"]):
-        return "Study/Learning"
-    if has_any(["money", "budget", "loan", "invest", "stock", "fees", "refund"]):
-        return "Money/Personal Finance"
-    if has_any(["career", "job", "resume", "cv", "interview", "apply"]):
-        return "Career/Work"
-    if has_any(["relationship", "communication", "friend", "chat", "texting", "awkward"]):
-        return "Relationships/Communication"
-    if has_any(["home", "rent", "utility", "life admin", "paperwork", "moving", "declutter", "cleaning"]):
-        return "Home/Life Admin"
-    if has_any(["buy", "shopping", "product", "recommend", "compare", "best", "value"]):
-        return "Shopping/Products"
-    if has_any(["event", "ticket", "concert", "sports", "weekend plan", "date plan", "rainy day"]):
-        return "Events/Leisure"
 
-    return "Dev/Tools"
+# score_cluster signal words (substring matches against the lower-cased cluster text)
+SOLVABLE_SIGNALS = (
+    "how", "fix", "error", "failed", "can't", "cannot", "help",
+    "設定", "直し", "原因", "エラー", "できない", "不具合", "失敗",
+)
+TOOL_SIGNALS = (
+    "convert", "compress", "calculator", "generator", "planner", "template", "checklist", "step-by-step", "schedule",
+    "変換", "圧縮", "計算", "チェック", "テンプレ", "ツール", "手順",
+)
+LIFE_DECISION_SIGNALS = (
+    "plan", "itinerary", "packing", "what should i do", "recommend", "best", "compare", "budget", "schedule",
+    "checklist", "template", "step by step", "meal prep", "study plan",
+)
+URGENCY_SIGNALS = (
+    "urgent", "today", "tomorrow", "this week", "before i go", "deadline", "soon", "asap",
+    "今日", "明日", "今週", "出発前", "締切",
+)
+STUCK_SIGNALS = (
+    "i'm stuck", "confused", "overwhelmed", "don't know what to choose", "not sure", "anxiety",
+    "詰んだ", "わからない", "迷う", "不安",
+)
+LIFE_CATEGORIES = frozenset({
+    "Travel/Planning", "Food/Cooking", "Health/Fitness", "Study/Learning", "Money/Personal Finance",
+    "Career/Work", "Relationships/Communication", "Home/Life Admin", "Shopping/Products", "Events/Leisure",
+})
 
 
 def score_cluster(posts: List[Post], category: str) -> float:
@@ -1331,32 +1597,11 @@ def score_cluster(posts: List[Post], category: str) -> float:
     size = len(posts)
     text = " ".join([p.norm_text() for p in posts]).lower()
 
-    solvable_signals = [
-        "how", "fix", "error", "failed", "can't", "cannot", "help",
-        "設定", "直し", "原因", "エラー", "できない", "不具合", "失敗",
-    ]
-    tool_signals = [
-        "convert", "compress", "calculator", "generator", "planner", "template", "checklist", "step-by-step", "schedule",
-        "変換", "圧縮", "計算", "チェック", "テンプレ", "ツール", "手順",
-    ]
-    life_decision = [
-        "plan", "itinerary", "packing", "what should i do", "recommend", "best", "compare", "budget", "schedule",
-        "checklist", "template", "step by step", "meal prep", "study plan",
-    ]
-    urgency = [
-        "urgent", "today", "tomorrow", "this week", "before i go", "deadline", "soon", "asap",
-        "今日", "明日", "今週", "出発前", "締切",
-    ]
-    stuck = [
-        "i'm stuck", "confused", "overwhelmed", "don't know what to choose", "not sure", "anxiety",
-        "詰んだ", "わからない", "迷う", "不安",
-    ]
-
-    s1 = sum(1 for w in solvable_signals if w in text)
-    s2 = sum(1 for w in tool_signals if w in text)
-    s3 = sum(1 for w in life_decision if w in text)
-    s4 = sum(1 for w in urgency if w in text)
-    s5 = sum(1 for w in stuck if w in text)
+    s1 = sum(1 for w in SOLVABLE_SIGNALS if w in text)
+    s2 = sum(1 for w in TOOL_SIGNALS if w in text)
+    s3 = sum(1 for w in LIFE_DECISION_SIGNALS if w in text)
+    s4 = sum(1 for w in URGENCY_SIGNALS if w in text)
+    s5 = sum(1 for w in STUCK_SIGNALS if w in text)
 
     score = size * 1.8 + s1 * 0.5 + s2 * 0.7 + s3 * 0.55 + s4 * 0.45 + s5 * 0.35
 
@@ -1364,8 +1609,7 @@ def score_cluster(posts: List[Post], category: str) -> float:
         score *= 0.75
 
     # mild balancing so life categories can compete
-    if category in ["Travel/Planning", "Food/Cooking", "Health/Fitness", "Study/Learning", "Money/Personal Finance",
-                    "Career/Work", "Relationships/Communication", "Home/Life Admin", "Shopping/Products", "Events/Leisure"]:
+    if category in LIFE_CATEGORIES:
         score *= 1.12
 
     return float(score)
@@ -1430,12 +1674,8 @@ def make_theme(posts: List[Post]) -> Theme:
     # collision-safe slug allocation happens later
     title = f"{search_title} | {SITE_BRAND}"
 
-    problems: List[str] = []
-    for p in posts[:12]:
-        line = p.norm_text()[:140].rstrip()
-        if line:
-            problems.append(line)
-    problems = uniq_keep_order([re.sub(r"\s+", " ", x) for x in problems])
+    # norm_text() already collapses every whitespace run to one space
+    problems = uniq_keep_order([line for line in (p.norm_text()[:140].rstrip() for p in posts[:12]) if line])
 
     while len(problems) < 10:
         problems.append(f"Trouble related to {category}: symptom #{len(problems)+1}")
@@ -1497,7 +1737,16 @@ def sanitize_affiliate_html(h: str) -> str:
     return h2.strip()
 
 
+# (id(aff_norm), category, topn) -> (aff_norm, picks); aff_norm is kept to guard against id() reuse
+_AFF_PICK_CACHE: Dict[Tuple[int, str, int], Tuple[Dict[str, Any], List[Dict[str, Any]]]] = {}
+
+
 def pick_affiliates_for_category(aff_norm: Dict[str, List[Dict[str, Any]]], category: str, topn: int = 2) -> List[Dict[str, Any]]:
+    key = (id(aff_norm), category, topn)
+    hit = _AFF_PICK_CACHE.get(key)
+    if hit is not None and hit[0] is aff_norm:
+        return list(hit[1])
+
     items = aff_norm.get(category, []) or []
 
     def pr(x: Dict[str, Any]) -> float:
@@ -1520,7 +1769,9 @@ def pick_affiliates_for_category(aff_norm: Dict[str, List[Dict[str, Any]]], cate
             pass
 
     cleaned.sort(key=lambda x: -pr(x))
-    return cleaned[:topn]
+    picks = cleaned[:topn]
+    _AFF_PICK_CACHE[key] = (aff_norm, picks)
+    return list(picks)
 
 
 def audit_affiliate_keys(aff_raw: Dict[str, Any]) -> Dict[str, Any]:
@@ -1538,7 +1789,7 @@ def audit_affiliate_keys(aff_raw: Dict[str, Any]) -> Dict[str, Any]:
     keys.discard("categories")
 
     missing = [c for c in CATEGORIES_22 if c not in keys]
-    extra = sorted([k for k in keys if k not in set(CATEGORIES_22)])
+    extra = sorted(keys.difference(CATEGORIES_22))
 
     return {
         "missing": missing,
@@ -1594,57 +1845,87 @@ def write_hub_sites(sites: List[Dict[str, Any]], aggregates: Dict[str, Any]) ->
     payload = {
         "sites": sites,
         "aggregates": aggregates,  # categories / popular / new / purpose
-        "updated_at": now_iso(),
+        "updated_at": run_iso(),
     }
     write_json(HUB_SITES_JSON, payload)
 
 
+# purpose buckets for hub navigation: (bucket, lowercase title substrings)
+PURPOSE_KEYWORDS: Tuple[Tuple[str, Tuple[str, ...]], ...] = (
+    ("convert", ("convert", "変換", "pdf", "docx", "png", "mp4")),
+    ("time", ("time", "schedule", "calendar", "deadline", "study plan", "itinerary")),
+    ("productivity", ("template", "checklist", "planner", "workflow", "habit")),
+    ("pricing", ("budget", "fees", "cost", "price", "compare", "refund")),
+)
+
+# popularity signals, in priority order (recency is the fallback)
+POP_FIELDS = ("views", "score", "popularity")
+
+
+def _site_ts(s: Dict[str, Any]) -> float:
+    """Recency of a hub site: updated_at, else created_at, as epoch seconds (0.0 if missing/invalid)."""
+    iso = s.get("updated_at") or s.get("created_at")
+    if not iso:
+        return 0.0
+    try:
+        if iso.endswith("Z"):
+            iso = iso[:-1] + "+00:00"
+        return dt.datetime.fromisoformat(iso).timestamp()
+    except Exception:
+        return 0.0
+
+
+def _site_pop(s: Dict[str, Any]) -> Optional[float]:
+    """First usable POP_FIELDS value of a hub site, or None so the caller can fall back to recency."""
+    for k in POP_FIELDS:
+        if k in s:
+            try:
+                return float(s[k])
+            except Exception:
+                pass
+    return None
+
+
 def compute_aggregates(all_sites: List[Dict[str, Any]]) -> Dict[str, Any]:
     """
     Provide hub-strengthening data via sites.json (categories list + popular/new/purpose routes).
     Even if hub frontend ignores it today, the data is ready and future-proof.
     """
-    # categories
-    cats: Dict[str, List[Dict[str, Any]]] = {}
-    for cat in CATEGORIES_22:
-        cats[cat] = []
-
+    # one pass over all_sites: (link dict, title lower, category, ts, pop, sort title) per site
+    entries = []
     for s in all_sites:
-        cat = s.get("category") or ""
-        if cat in cats:
-            cats[cat].append({
-                "title": s.get("search_title") or s.get("title") or "Tool",
-                "url": s.get("url") or "#",
-                "slug": s.get("slug") or "",
-            })
-
-    for cat in cats:
-        # stable ordering: title
-        cats[cat].sort(key=lambda x: (x.get("title") or "").lower())
-
-    # new: by updated_at / created_at
-    def ts(s: Dict[str, Any]) -> float:
-        iso = s.get("updated_at") or s.get("created_at") or ""
-        try:
-            return dt.datetime.fromisoformat(iso.replace("Z", "+00:00")).timestamp()
-        except Exception:
-            return 0.0
+        get = s.get
+        title = get("search_title") or get("title") or ""
+        title_lower = title.lower()
+        t = _site_ts(s)
+        pop = _site_pop(s)
+        entries.append((
+            {"title": title or "Tool", "url": get("url") or "#", "slug": get("slug") or ""},
+            title_lower,
+            get("category") or "",
+            t,
+            t if pop is None else pop,
+            title_lower or "tool",
+        ))
 
-    new_sites = sorted(all_sites, key=ts, reverse=True)[:12]
-    new_list = [{"title": s.get("search_title") or s.get("title") or "Tool", "url": s.get("url") or "#", "slug": s.get("slug") or ""} for s in new_sites]
+    # categories
+    cat_entries: Dict[str, List[Tuple[Any, ...]]] = {cat: [] for cat in CATEGORIES_22}
+    for e in entries:
+        bucket = cat_entries.get(e[2])
+        if bucket is not None:
+            bucket.append(e)
+
+    # stable ordering: title
+    cats: Dict[str, List[Dict[str, Any]]] = {
+        cat: [e[0] for e in sorted(items, key=itemgetter(5))] for cat, items in cat_entries.items()
+    }
 
-    # popular: prefer views/score/popularity if present; else fallback to recency
-    def pop_metric(s: Dict[str, Any]) -> float:
-        for k in ["views", "score", "popularity"]:
-            if k in s:
-                try:
-                    return float(s.get(k, 0))
-                except Exception:
-                    pass
-        return ts(s)
+    # top-12 only; nlargest keeps sorted(..., reverse=True)[:12] order, ties included
+    by_ts = heapq.nlargest(12, entries, key=itemgetter(3))
+    new_list = [e[0] for e in by_ts]
 
-    popular_sites = sorted(all_sites, key=pop_metric, reverse=True)[:12]
-    popular_list = [{"title": s.get("search_title") or s.get("title") or "Tool", "url": s.get("url") or "#", "slug": s.get("slug") or ""} for s in popular_sites]
+    by_pop = heapq.nlargest(12, entries, key=itemgetter(4))
+    popular_list = [e[0] for e in by_pop]
 
     # purpose routes: simple buckets for internal navigation
     purpose_buckets = {
@@ -1653,23 +1934,16 @@ def compute_aggregates(all_sites: List[Dict[str, Any]]) -> Dict[str, Any]:
         "By purpose": [],  # filled below
     }
 
-    purpose_keywords = {
-        "convert": ["convert", "変換", "pdf", "docx", "png", "mp4"],
-        "time": ["time", "schedule", "calendar", "deadline", "study plan", "itinerary"],
-        "productivity": ["template", "checklist", "planner", "workflow", "habit"],
-        "pricing": ["budget", "fees", "cost", "price", "compare", "refund"],
-    }
-
-    by_purpose: Dict[str, List[Dict[str, Any]]] = {k: [] for k in purpose_keywords.keys()}
-    for s in all_sites:
-        title = (s.get("search_title") or s.get("title") or "").lower()
-        for bucket, words in purpose_keywords.items():
-            if any(w.lower() in title for w in words):
-                by_purpose[bucket].append({
-                    "title": s.get("search_title") or s.get("title") or "Tool",
-                    "url": s.get("url") or "#",
-                    "slug": s.get("slug") or "",
-                })
+    by_purpose: Dict[str, List[Dict[str, Any]]] = {k: [] for k, _ in PURPOSE_KEYWORDS}
+    for e in entries:
+        title = e[1]
+        if not title:
+            continue
+        for bucket, words in PURPOSE_KEYWORDS:
+            for w in words:
+                if w in title:
+                    by_purpose[bucket].append(e[0])
+                    break
 
     # keep small
     for bucket in by_purpose:
@@ -1693,27 +1967,19 @@ BASE62 = "0123456789abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ"
 def to_base62(n: int) -> str:
     if n == 0:
         return "0"
-    out = []
+    out = ""
     while n > 0:
-        n, r = divmod(n, 62)
-        out.append(BASE62[r])
-    return "".join(reversed(out))
+        out = BASE62[n % 62] + out
+        n //= 62
+    return out
 
 def short_code_for_url(url: str) -> str:
-    h = hashlib.sha1(url.encode("utf-8")).hexdigest()[:10]
-    n = int(h, 16)
-    code = to_base62(n)
-    return code[:8]
+    # not security-sensitive: the hash only spreads urls over 40 bits (<= 7 base62 digits).
+    # codes are computed once per new tool url, so published /go/<code>/ pages are unaffected.
+    n = int.from_bytes(hashlib.blake2b(url.encode("utf-8"), digest_size=5).digest(), "big")
+    return to_base62(n)
 
-def build_shortlink_page(target_url: str, code: str) -> Tuple[str, str]:
-    """
-    Returns (relative_path_under_repo, html_content)
-    Short link lives under: goliath/go/<code>/index.html
-    """
-    rel_dir = os.path.join("goliath", "go", code)
-    rel_path = os.path.join(rel_dir, "index.html")
-    esc = html.escape(target_url, quote=True)
-    content = f"""<!doctype html>
+_SHORTLINK_HTML = """<!doctype html>
 <html lang="en">
 <head>
   <meta charset="utf-8">
@@ -1730,7 +1996,14 @@ def build_shortlink_page(target_url: str, code: str) -> Tuple[str, str]:
 </body>
 </html>
 """
-    return rel_path, content
+
+def build_shortlink_page(target_url: str, code: str) -> Tuple[str, str]:
+    """
+    Returns (relative_path_under_repo, html_content)
+    Short link lives under: goliath/go/<code>/index.html
+    """
+    rel_path = f"goliath/go/{code}/index.html"
+    return rel_path, _SHORTLINK_HTML.format(esc=html_escape(target_url))
 
 
 # =============================================================================
@@ -2055,19 +2328,29 @@ I18N = {
 }
 
 
+# LANGS is static, so serialize it once at import
+_LANGS_JSON = json.dumps(LANGS)
+
+
+@lru_cache(maxsize=8)
 def build_i18n_script(default_lang: str = "en") -> str:
-    i18n_json = json.dumps(I18N, ensure_ascii=False)
-    langs_json = json.dumps(LANGS)
+    # resolve the default-language fallback here so the page does a single lookup per node
+    base = I18N.get(default_lang, {})
+    merged = {
+        lang: {**base, **{k: v for k, v in I18N.get(lang, {}).items() if v}}
+        for lang in dict.fromkeys([*LANGS, default_lang])
+    }
+    i18n_json = json.dumps(merged, ensure_ascii=False)
     return f"""<script>
 const I18N = {i18n_json};
-const LANGS = {langs_json};
+const LANGS = {_LANGS_JSON};
 function setLang(lang) {{
   if (!LANGS.includes(lang)) lang = "{default_lang}";
   document.documentElement.setAttribute("lang", lang);
   localStorage.setItem("lang", lang);
   document.querySelectorAll("[data-i18n]").forEach(el => {{
     const key = el.getAttribute("data-i18n");
-    const v = (I18N[lang] && I18N[lang][key]) || (I18N["{default_lang}"][key]) || key;
+    const v = I18N[lang][key] || key;
     el.textContent = v;
   }});
 }}
@@ -2090,393 +2373,415 @@ document.addEventListener("DOMContentLoaded", initLang);
 # =============================================================================
 def build_quick_answer(category: str, keywords: List[str]) -> str:
     kw = ", ".join(keywords[:10])
-    base = [
-        "最短で進める方針は「再現条件の固定 → 原因の切り分け → 最小変更 → 検証 → 記録」です。",
-        f"今回のカテゴリは「{category}」なので、まずは“どこで止まっているか”を小さく分解して確認します。",
-        f"観測キーワード: {kw}",
-        "下のチェックリストは、上から順に潰せば“事故率”が下がる順番で並べています。",
-    ]
-    return "\n".join(base)
+    return (
+        "最短で進める方針は「再現条件の固定 → 原因の切り分け → 最小変更 → 検証 → 記録」です。\n"
+        f"今回のカテゴリは「{category}」なので、まずは“どこで止まっているか”を小さく分解して確認します。\n"
+        f"観測キーワード: {kw}\n"
+        "下のチェックリストは、上から順に潰せば“事故率”が下がる順番で並べています。"
+    )
 
 
-def build_causes(category: str) -> List[str]:
-    common = {
-        "Web/Hosting": [
-            "DNSの反映待ち（TTL）やレコード種別の誤り（A/CNAME/AAAAの混在）",
-            "HTTPS/証明書の自動発行待ち、リダイレクトのループ",
-            "ホスティング側の設定（カスタムドメイン、パス、ベースURL）不一致",
-            "キャッシュ（CDN/ブラウザ/Service Worker）による古い表示",
-        ],
-        "PDF/Docs": [
-            "ファイルサイズ/ページ数上限による失敗",
-            "フォント埋め込み・暗号化・スキャンPDFでの互換性問題",
-            "変換先形式の選択ミス（画像化が必要なのにテキスト変換を選ぶ等）",
-            "ブラウザのメモリ不足・拡張機能の干渉",
-        ],
-        "Media": [
-            "コーデック不一致（H.264/H.265/AV1）や音声形式（AAC/Opus）",
-            "ビットレート/解像度上限によるエラー",
-            "端末性能・メモリ不足による処理落ち",
-            "ファイル破損・コンテナ不整合（MP4/MKV）",
-        ],
-        "Data/Spreadsheets": [
-            "関数の参照範囲ズレ・絶対参照/相対参照のミス",
-            "区切り文字・文字コード・日付形式の差（CSV取り込み）",
-            "フィルタ/ピボットの更新忘れ",
-            "共有設定/権限で編集が反映されない",
-        ],
-        "Security/Privacy": [
-            "権限（OAuth/トークン）期限切れ・スコープ不足",
-            "Cookie/追跡ブロックでログインが壊れる",
-            "2FAや端末認証の不一致",
-            "偽サイト/フィッシング・セキュリティソフトの誤検知",
-        ],
-        "AI/Automation": [
-            "APIキー/権限不足、レート制限、モデル名の不一致",
-            "入力が曖昧で出力が安定しない（仕様が揺れている）",
-            "ファイル/パスの上書き事故、衝突時の処理漏れ",
-            "ログ不足で原因特定が遅れる",
-        ],
-        "Travel/Planning": [
-            "目的・日数・移動制約が決まっておらず、旅程が発散する",
-            "移動時間の見積もりが甘く、詰め込みすぎになる",
-            "持ち物が“現地調達できる物/できない物”で分けられていない",
-            "予算配分（宿/交通/食/予備費）が曖昧で不安が残る",
-        ],
-        "Food/Cooking": [
-            "献立が先に決まらず、買い物が迷子になる",
-            "作り置きの“保存日数/温め直し”を考えずに回らない",
-            "栄養バランス（たんぱく質/野菜/炭水化物）の偏り",
-            "時間の見積もり不足で結局外食になる",
-        ],
-        "Health/Fitness": [
-            "睡眠/食事/運動のどれがボトルネックか分かっていない",
-            "習慣化の単位が大きすぎて継続できない",
-            "強度が高すぎて疲労→中断のループ",
-            "記録がなく、改善点が見えない",
-        ],
-        "Study/Learning": [
-            "復習タイミングが固定されず、忘却で効率が落ちる",
-            "教材が多すぎて優先順位が決まらない",
-            "目標が抽象的で、今日やることに落ちない",
-            "集中環境が整っていない（通知/場所/時間帯）",
-        ],
-        "Money/Personal Finance": [
-            "固定費・変動費・特別費の区別がなく、原因が見えない",
-            "手数料/返金条件の確認不足",
-            "支払い日・引き落とし日がズレて資金繰りが苦しい",
-            "比較軸（総額/利便性/リスク）が曖昧",
-        ],
-        "Career/Work": [
-            "職務要約が長すぎて要点が埋もれる",
-            "実績が“数字”で書けておらず強みが伝わらない",
-            "面接想定問答が用意されておらず詰まる",
-            "応募先ごとのカスタムが不足",
-        ],
-        "Relationships/Communication": [
-            "伝えたいことが多く、文が長くなって誤解される",
-            "相手の温度感に合わせた言い回しが不足",
-            "断り方/お願いの型がなく気まずくなる",
-            "返信タイミングが不安で空回りする",
-        ],
-        "Home/Life Admin": [
-            "やることの棚卸しがなく、抜け漏れが出る",
-            "期限・提出先・必要書類が散らばっている",
-            "片付けの範囲が広すぎて進まない",
-            "ルーティン化できず毎回ゼロから考える",
-        ],
-        "Shopping/Products": [
-            "比較軸（価格/保証/サイズ/耐久/用途）が定義できていない",
-            "レビューの読み方が偏り、結論が出ない",
-            "必要十分のスペックが分からない",
-            "買うタイミング（セール/返品可否）が不明",
-        ],
-        "Events/Leisure": [
-            "候補が多く、優先順位が決まらない",
-            "天気・混雑・移動時間の見積もり不足",
-            "当日の持ち物/予約/支払いが不安",
-            "同行者の希望が整理できていない",
-        ],
-    }
-    return common.get(category, [
-        "入力・前提条件のズレ（想定と実際が違う）",
-        "権限/設定/バージョンの不一致",
-        "キャッシュや反映待ち",
-        "原因が前段にあるのに、見えている画面で決め打ちしている",
-    ])
+_CAUSES_BY_CATEGORY: Dict[str, Tuple[str, ...]] = {
+    "Web/Hosting": (
+        "DNSの反映待ち（TTL）やレコード種別の誤り（A/CNAME/AAAAの混在）",
+        "HTTPS/証明書の自動発行待ち、リダイレクトのループ",
+        "ホスティング側の設定（カスタムドメイン、パス、ベースURL）不一致",
+        "キャッシュ（CDN/ブラウザ/Service Worker）による古い表示",
+    ),
+    "PDF/Docs": (
+        "ファイルサイズ/ページ数上限による失敗",
+        "フォント埋め込み・暗号化・スキャンPDFでの互換性問題",
+        "変換先形式の選択ミス（画像化が必要なのにテキスト変換を選ぶ等）",
+        "ブラウザのメモリ不足・拡張機能の干渉",
+    ),
+    "Media": (
+        "コーデック不一致（H.264/H.265/AV1）や音声形式（AAC/Opus）",
+        "ビットレート/解像度上限によるエラー",
+        "端末性能・メモリ不足による処理落ち",
+        "ファイル破損・コンテナ不整合（MP4/MKV）",
+    ),
+    "Data/Spreadsheets": (
+        "関数の参照範囲ズレ・絶対参照/相対参照のミス",
+        "区切り文字・文字コード・日付形式の差（CSV取り込み）",
+        "フィルタ/ピボットの更新忘れ",
+        "共有設定/権限で編集が反映されない",
+    ),
+    "Security/Privacy": (
+        "権限（OAuth/トークン）期限切れ・スコープ不足",
+        "Cookie/追跡ブロックでログインが壊れる",
+        "2FAや端末認証の不一致",
+        "偽サイト/フィッシング・セキュリティソフトの誤検知",
+    ),
+    "AI/Automation": (
+        "APIキー/権限不足、レート制限、モデル名の不一致",
+        "入力が曖昧で出力が安定しない（仕様が揺れている）",
+        "ファイル/パスの上書き事故、衝突時の処理漏れ",
+        "ログ不足で原因特定が遅れる",
+    ),
+    "Travel/Planning": (
+        "目的・日数・移動制約が決まっておらず、旅程が発散する",
+        "移動時間の見積もりが甘く、詰め込みすぎになる",
+        "持ち物が“現地調達できる物/できない物”で分けられていない",
+        "予算配分（宿/交通/食/予備費）が曖昧で不安が残る",
+    ),
+    "Food/Cooking": (
+        "献立が先に決まらず、買い物が迷子になる",
+        "作り置きの“保存日数/温め直し”を考えずに回らない",
+        "栄養バランス（たんぱく質/野菜/炭水化物）の偏り",
+        "時間の見積もり不足で結局外食になる",
+    ),
+    "Health/Fitness": (
+        "睡眠/食事/運動のどれがボトルネックか分かっていない",
+        "習慣化の単位が大きすぎて継続できない",
+        "強度が高すぎて疲労→中断のループ",
+        "記録がなく、改善点が見えない",
+    ),
+    "Study/Learning": (
+        "復習タイミングが固定されず、忘却で効率が落ちる",
+        "教材が多すぎて優先順位が決まらない",
+        "目標が抽象的で、今日やることに落ちない",
+        "集中環境が整っていない（通知/場所/時間帯）",
+    ),
+    "Money/Personal Finance": (
+        "固定費・変動費・特別費の区別がなく、原因が見えない",
+        "手数料/返金条件の確認不足",
+        "支払い日・引き落とし日がズレて資金繰りが苦しい",
+        "比較軸（総額/利便性/リスク）が曖昧",
+    ),
+    "Career/Work": (
+        "職務要約が長すぎて要点が埋もれる",
+        "実績が“数字”で書けておらず強みが伝わらない",
+        "面接想定問答が用意されておらず詰まる",
+        "応募先ごとのカスタムが不足",
+    ),
+    "Relationships/Communication": (
+        "伝えたいことが多く、文が長くなって誤解される",
+        "相手の温度感に合わせた言い回しが不足",
+        "断り方/お願いの型がなく気まずくなる",
+        "返信タイミングが不安で空回りする",
+    ),
+    "Home/Life Admin": (
+        "やることの棚卸しがなく、抜け漏れが出る",
+        "期限・提出先・必要書類が散らばっている",
+        "片付けの範囲が広すぎて進まない",
+        "ルーティン化できず毎回ゼロから考える",
+    ),
+    "Shopping/Products": (
+        "比較軸（価格/保証/サイズ/耐久/用途）が定義できていない",
+        "レビューの読み方が偏り、結論が出ない",
+        "必要十分のスペックが分からない",
+        "買うタイミング（セール/返品可否）が不明",
+    ),
+    "Events/Leisure": (
+        "候補が多く、優先順位が決まらない",
+        "天気・混雑・移動時間の見積もり不足",
+        "当日の持ち物/予約/支払いが不安",
+        "同行者の希望が整理できていない",
+    ),
+}
+
+_CAUSES_DEFAULT: Tuple[str, ...] = (
+    "入力・前提条件のズレ（想定と実際が違う）",
+    "権限/設定/バージョンの不一致",
+    "キャッシュや反映待ち",
+    "原因が前段にあるのに、見えている画面で決め打ちしている",
+)
+
+
+def build_causes(category: str) -> Tuple[str, ...]:
+    return _CAUSES_BY_CATEGORY.get(category, _CAUSES_DEFAULT)
+
+
+_BASE_STEPS: Tuple[str, ...] = (
+    "再現条件を固定する（同じ入力・同じ手順・同じ端末/ブラウザで再現）",
+    "表示/ログをそのまま保存（コピペ/スクショ、時刻も残す）",
+    "影響範囲が小さい順に確認（確認→読み取り→最小変更→検証）",
+    "直ったら差分を記録し、再発防止チェックを作る（次回3分復旧が目標）",
+)
+
+# categories that also get the overwrite/logging guard steps
+_WEB_AI_CATEGORIES = frozenset({"Web/Hosting", "AI/Automation"})
+
+_WEB_AI_STEPS: Tuple[str, ...] = (
+    "上書き禁止を強制する（衝突は -2/-3、凍結パスは触らない）",
+    "ログ粒度を上げる（HTTPステータス/例外/レスポンス先頭）",
+)
+
+_EXTRA_STEPS_BY_CATEGORY: Dict[str, Tuple[str, ...]] = {
+    "Travel/Planning": (
+        "日数・出発/帰宅時刻・絶対にやりたいこと（3つ）を先に固定",
+        "移動時間を先に置いて、残りに観光を入れる（詰め込み防止）",
+        "持ち物を「必須/現地調達/予備」に分けてチェックリスト化",
+        "予算を「宿/交通/食/観光/予備費」に割って上限を決める",
+    ),
+    "Food/Cooking": (
+        "主菜を先に決める（3〜5個）→副菜→主食の順で決める",
+        "買い物リストをカテゴリ別（肉/野菜/調味料…）に出す",
+        "作り置きは保存日数ベースで回す（先に消費順を決める）",
+        "調理は同時進行しやすい順に並べる（焼く/茹でる/切る）",
+    ),
+    "Health/Fitness": (
+        "まず睡眠を固定（就寝/起床の時刻を先に決める）",
+        "運動は最小単位から（例：腕立て5回/散歩10分）",
+        "週の回数→強度の順で上げる（いきなり強度は上げない）",
+        "記録は1項目だけ（体重/歩数/睡眠など）から開始",
+    ),
+    "Study/Learning": (
+        "目標を「今週の量」→「今日の量」に割る（最小単位を作る）",
+        "復習は翌日/3日後/7日後の固定枠で回す",
+        "教材は同時に2つまで（増やすほど迷う）",
+        "集中は環境で作る（通知OFF/場所固定/開始の儀式）",
+    ),
+    "Money/Personal Finance": (
+        "固定費/変動費/特別費に分けて、まず固定費から最適化",
+        "手数料/返金条件/解約条件を“先に”確認して事故を防ぐ",
+        "支払い日・引き落とし日をカレンダーに固定（ズレで詰まない）",
+        "比較軸（総額/利便性/リスク）を1枚にまとめて決め切る",
+    ),
+    "Career/Work": (
+        "実績は数字で書く（例：改善率/件数/期間/役割）",
+        "職務要約は3行で結論→根拠→再現性の順",
+        "応募先ごとに要点だけ差し替える（全部を書き換えない）",
+        "面接は想定質問を先に潰す（自己紹介/志望動機/強み/弱み）",
+    ),
+    "Relationships/Communication": (
+        "文を短くする（1文1要点、余計な前置きを削る）",
+        "お願い/断り/お礼の型を使う（毎回ゼロから考えない）",
+        "相手の温度感に合わせて情報量を調整する",
+        "返信が不安なら“選択肢”で返す（AかB、どっちがいい？形式）",
+    ),
+    "Home/Life Admin": (
+        "やることを棚卸し→期限→提出先→必要書類の順で整理",
+        "チェックリストは“提出単位”で作る（書類1つ=1項目）",
+        "片付けは範囲を小さく切る（引き出し1つなど）",
+        "ルーティンは固定時刻に置く（毎週/毎月で繰り返し）",
+    ),
+    "Shopping/Products": (
+        "比較軸を決める（価格/保証/サイズ/耐久/用途）",
+        "必要十分スペックを先に確定（上位互換を追わない）",
+        "レビューは低評価→中評価→高評価の順で読む（地雷回避）",
+        "返品条件と到着日を最後に確認して購入",
+    ),
+    "Events/Leisure": (
+        "候補を3つまでに絞る（増やすほど決められない）",
+        "天気・混雑・移動時間を先に置く（当日崩壊を防ぐ）",
+        "予約/支払い/持ち物を前日までに確定",
+        "同行者がいるなら希望を1枚にまとめて合意",
+    ),
+}
 
 
-def build_steps(category: str) -> List[str]:
+@lru_cache(maxsize=len(CATEGORIES_22) + 8)
+def build_steps(category: str) -> Tuple[str, ...]:
     """
     Step-by-step checklist generator.
     NOTE: この関数は SyntaxError の原因になりやすいので、
           括弧やクォートの閉じ忘れが起きない “安全な固定形” にしています。
     """
-    steps: List[str] = [
-        "再現条件を固定する（同じ入力・同じ手順・同じ端末/ブラウザで再現）",
-        "表示/ログをそのまま保存（コピペ/スクショ、時刻も残す）",
-        "影響範囲が小さい順に確認（確認→読み取り→最小変更→検証）",
-        "直ったら差分を記録し、再発防止チェックを作る（次回3分復旧が目標）",
-    ]
+    steps = _BASE_STEPS
+    if category in _WEB_AI_CATEGORIES:
+        steps += _WEB_AI_STEPS
+    steps += _EXTRA_STEPS_BY_CATEGORY.get(category, ())
 
-    if category in ["Web/Hosting", "AI/Automation"]:
-        steps += [
-            "上書き禁止を強制する（衝突は -2/-3、凍結パスは触らない）",
-            "ログ粒度を上げる（HTTPステータス/例外/レスポンス先頭）",
-        ]
+    # 余分に増えすぎないように上限
+    return steps[:28]
 
-    if category == "Travel/Planning":
-        steps += [
-            "日数・出発/帰宅時刻・絶対にやりたいこと（3つ）を先に固定",
-            "移動時間を先に置いて、残りに観光を入れる（詰め込み防止）",
-            "持ち物を「必須/現地調達/予備」に分けてチェックリスト化",
-            "予算を「宿/交通/食/観光/予備費」に割って上限を決める",
-        ]
 
-    if category == "Food/Cooking":
-        steps += [
-            "主菜を先に決める（3〜5個）→副菜→主食の順で決める",
-            "買い物リストをカテゴリ別（肉/野菜/調味料…）に出す",
-            "作り置きは保存日数ベースで回す（先に消費順を決める）",
-            "調理は同時進行しやすい順に並べる（焼く/茹でる/切る）",
-        ]
+_PITFALLS_BASE: Tuple[str, ...] = (
+    "一気に複数箇所を変えてしまい、どれが原因か分からなくなる",
+    "反映待ち（DNS/キャッシュ）を無視して焦ってさらに壊す",
+    "ログ/メモを取らずに試行回数だけ増やす（後で復旧不能になる）",
+    "“いま見えている画面”が原因だと決めつける（前段が原因のことが多い）",
+)
 
-    if category == "Health/Fitness":
-        steps += [
-            "まず睡眠を固定（就寝/起床の時刻を先に決める）",
-            "運動は最小単位から（例：腕立て5回/散歩10分）",
-            "週の回数→強度の順で上げる（いきなり強度は上げない）",
-            "記録は1項目だけ（体重/歩数/睡眠など）から開始",
-        ]
-
-    if category == "Study/Learning":
-        steps += [
-            "目標を「今週の量」→「今日の量」に割る（最小単位を作る）",
-            "復習は翌日/3日後/7日後の固定枠で回す",
-            "教材は同時に2つまで（増やすほど迷う）",
-            "集中は環境で作る（通知OFF/場所固定/開始の儀式）",
-        ]
-
-    if category == "Money/Personal Finance":
-        steps += [
-            "固定費/変動費/特別費に分けて、まず固定費から最適化",
-            "手数料/返金条件/解約条件を“先に”確認して事故を防ぐ",
-            "支払い日・引き落とし日をカレンダーに固定（ズレで詰まない）",
-            "比較軸（総額/利便性/リスク）を1枚にまとめて決め切る",
-        ]
-
-    if category == "Career/Work":
-        steps += [
-            "実績は数字で書く（例：改善率/件数/期間/役割）",
-            "職務要約は3行で結論→根拠→再現性の順",
-            "応募先ごとに要点だけ差し替える（全部を書き換えない）",
-            "面接は想定質問を先に潰す（自己紹介/志望動機/強み/弱み）",
-        ]
-
-    if category == "Relationships/Communication":
-        steps += [
-            "文を短くする（1文1要点、余計な前置きを削る）",
-            "お願い/断り/お礼の型を使う（毎回ゼロから考えない）",
-            "相手の温度感に合わせて情報量を調整する",
-            "返信が不安なら“選択肢”で返す（AかB、どっちがいい？形式）",
-        ]
-
-    if category == "Home/Life Admin":
-        steps += [
-            "やることを棚卸し→期限→提出先→必要書類の順で整理",
-            "チェックリストは“提出単位”で作る（書類1つ=1項目）",
-            "片付けは範囲を小さく切る（引き出し1つなど）",
-            "ルーティンは固定時刻に置く（毎週/毎月で繰り返し）",
-        ]
-
-    if category == "Shopping/Products":
-        steps += [
-            "比較軸を決める（価格/保証/サイズ/耐久/用途）",
-            "必要十分スペックを先に確定（上位互換を追わない）",
-            "レビューは低評価→中評価→高評価の順で読む（地雷回避）",
-            "返品条件と到着日を最後に確認して購入",
-        ]
-
-    if category == "Events/Leisure":
-        steps += [
-            "候補を3つまでに絞る（増やすほど決められない）",
-            "天気・混雑・移動時間を先に置く（当日崩壊を防ぐ）",
-            "予約/支払い/持ち物を前日までに確定",
-            "同行者がいるなら希望を1枚にまとめて合意",
-        ]
-
-    # 余分に増えすぎないように上限
-    return steps[:28]
+# categories that get the extra comparison / habit-sizing pitfalls and the contingency next action
+_COMPARE_CATEGORIES = frozenset({"Travel/Planning", "Food/Cooking", "Shopping/Products"})
+_HABIT_CATEGORIES = frozenset({"Health/Fitness", "Study/Learning"})
+_CONTINGENCY_CATEGORIES = frozenset({"Travel/Planning", "Money/Personal Finance"})
 
+_NEXT_ACTIONS_BASE: Tuple[str, ...] = (
+    "別経路で同じ結果が出るか確認（別端末/別回線/別ブラウザ）",
+    "ログ/メモの粒度を上げる（失敗時の条件と差分を残す）",
+    "“元に戻せる形”で段階的にロールバック（変更前後の差分を残す）",
+    "同じ失敗を繰り返さないよう、チェック項目を固定化する",
+)
 
 
-def build_pitfalls(category: str) -> List[str]:
-    pitfalls = [
-        "一気に複数箇所を変えてしまい、どれが原因か分からなくなる",
-        "反映待ち（DNS/キャッシュ）を無視して焦ってさらに壊す",
-        "ログ/メモを取らずに試行回数だけ増やす（後で復旧不能になる）",
-        "“いま見えている画面”が原因だと決めつける（前段が原因のことが多い）",
-    ]
-    if category in ["Web/Hosting", "AI/Automation"]:
+@lru_cache(maxsize=len(CATEGORIES_22) + 8)
+def build_pitfalls(category: str) -> Tuple[str, ...]:
+    pitfalls = list(_PITFALLS_BASE)
+    if category in _WEB_AI_CATEGORIES:
         pitfalls.append("既存URLや凍結領域（/hub/）を上書きして資産を壊す（絶対禁止）")
-    if category in ["Travel/Planning", "Food/Cooking", "Shopping/Products"]:
+    if category in _COMPARE_CATEGORIES:
         pitfalls.append("比較軸が曖昧なまま情報収集し続けて決断できない")
-    if category in ["Health/Fitness", "Study/Learning"]:
+    if category in _HABIT_CATEGORIES:
         pitfalls.append("最初から量を盛りすぎて、続かず自己嫌悪になる")
-    return pitfalls
+    return tuple(pitfalls)
 
 
-def build_next_actions(category: str) -> List[str]:
-    nxt = [
-        "別経路で同じ結果が出るか確認（別端末/別回線/別ブラウザ）",
-        "ログ/メモの粒度を上げる（失敗時の条件と差分を残す）",
-        "“元に戻せる形”で段階的にロールバック（変更前後の差分を残す）",
-        "同じ失敗を繰り返さないよう、チェック項目を固定化する",
-    ]
+@lru_cache(maxsize=len(CATEGORIES_22) + 8)
+def build_next_actions(category: str) -> Tuple[str, ...]:
+    nxt = list(_NEXT_ACTIONS_BASE)
     if category == "Security/Privacy":
         nxt.append("怪しいリンク/認証画面は踏まない。公式ドメインと証明書を再確認")
-    if category in ["Travel/Planning", "Money/Personal Finance"]:
+    if category in _CONTINGENCY_CATEGORIES:
         nxt.append("最悪ケース（延泊/キャンセル/手数料）を先に想定して予備費・代替案を用意")
-    return nxt
+    return tuple(nxt)
 
 
-def build_faq(category: str) -> List[Tuple[str, str]]:
-    base = [
-        ("What should I check first?", "Fix the conditions: steps, expected result, actual result, and what changed recently."),
-        ("How do I know if it’s just cache / stale data?", "Try private mode or a different device. If it changes, cache is likely involved."),
-        ("What’s the safest order to troubleshoot?", "Confirm → read-only checks → one small change → verify → write down the diff."),
-        ("What should I do after it works?", "Save the diff + a quick checklist so the next recovery is under 3 minutes."),
-        ("How should I share this problem with someone?", "Include steps to reproduce, expected vs actual, logs/screenshots, and environment."),
-    ]
-    if category == "Web/Hosting":
-        base.append(("How long can DNS propagation take?", "It depends on TTL and resolvers. Confirm from a third-party DNS lookup too."))
-    if category == "Travel/Planning":
-        base.append(("How do I avoid overpacking?", "Split items into: must-have, can-buy-there, and optional backups. Then cut optional."))
-    if category == "Shopping/Products":
-        base.append(("How do I stop endless comparing?", "Limit to 3 options, pick 3 criteria, then decide using total cost + return policy."))
+class FAQItem(NamedTuple):
+    """One FAQ entry; still unpacks as (question, answer)."""
+    question: str
+    answer: str
+
+
+_FAQ_BASE: Tuple[FAQItem, ...] = (
+    FAQItem("What should I check first?", "Fix the conditions: steps, expected result, actual result, and what changed recently."),
+    FAQItem("How do I know if it’s just cache / stale data?", "Try private mode or a different device. If it changes, cache is likely involved."),
+    FAQItem("What’s the safest order to troubleshoot?", "Confirm → read-only checks → one small change → verify → write down the diff."),
+    FAQItem("What should I do after it works?", "Save the diff + a quick checklist so the next recovery is under 3 minutes."),
+    FAQItem("How should I share this problem with someone?", "Include steps to reproduce, expected vs actual, logs/screenshots, and environment."),
+)
+
+_FAQ_EXTRA_BY_CATEGORY: Dict[str, Tuple[FAQItem, ...]] = {
+    "Web/Hosting": (
+        FAQItem("How long can DNS propagation take?", "It depends on TTL and resolvers. Confirm from a third-party DNS lookup too."),
+    ),
+    "Travel/Planning": (
+        FAQItem("How do I avoid overpacking?", "Split items into: must-have, can-buy-there, and optional backups. Then cut optional."),
+    ),
+    "Shopping/Products": (
+        FAQItem("How do I stop endless comparing?", "Limit to 3 options, pick 3 criteria, then decide using total cost + return policy."),
+    ),
+}
+
+
+@lru_cache(maxsize=len(CATEGORIES_22) + 8)
+def build_faq(category: str) -> Tuple[FAQItem, ...]:
+    base = _FAQ_BASE + _FAQ_EXTRA_BY_CATEGORY.get(category, ())
     # ensure >= MIN_FAQ
     return base[: max(MIN_FAQ, 5)]
 
 
-def supplemental_resources_for_category(category: str) -> List[str]:
-    base: Dict[str, List[str]] = {
-        "Web/Hosting": [
-            "https://pages.github.com/",
-            "https://letsencrypt.org/docs/",
-            "https://developer.mozilla.org/en-US/docs/Learn/Common_questions/Web_mechanics/What_is_a_domain_name",
-        ],
-        "Security/Privacy": [
-            "https://owasp.org/www-project-top-ten/",
-            "https://developer.mozilla.org/en-US/docs/Web/HTTP/Cookies",
-            "https://en.wikipedia.org/wiki/Phishing",
-        ],
-        "PDF/Docs": [
-            "https://www.adobe.com/acrobat/resources/what-is-pdf.html",
-            "https://en.wikipedia.org/wiki/PDF",
-            "https://developer.mozilla.org/en-US/docs/Web/API/File",
-        ],
-        "Media": [
-            "https://ffmpeg.org/documentation.html",
-            "https://en.wikipedia.org/wiki/Video_codec",
-            "https://developer.mozilla.org/en-US/docs/Web/Media",
-        ],
-        "Data/Spreadsheets": [
-            "https://support.google.com/docs/?hl=en#topic=1382883",
-            "https://support.microsoft.com/excel",
-            "https://en.wikipedia.org/wiki/Comma-separated_values",
-        ],
-        "AI/Automation": [
-            "https://docs.github.com/en/actions",
-            "https://en.wikipedia.org/wiki/Cron",
-            "https://en.wikipedia.org/wiki/Automation",
-        ],
-        "Travel/Planning": [
-            "https://en.wikipedia.org/wiki/Travel_itinerary",
-            "https://en.wikipedia.org/wiki/Packing_list",
-            "https://www.wikivoyage.org/",
-        ],
-        "Food/Cooking": [
-            "https://en.wikipedia.org/wiki/Meal_preparation",
-            "https://en.wikipedia.org/wiki/Food_safety",
-            "https://www.fda.gov/food",
-        ],
-        "Health/Fitness": [
-            "https://en.wikipedia.org/wiki/Physical_fitness",
-            "https://en.wikipedia.org/wiki/Sleep_hygiene",
-            "https://www.who.int/health-topics/physical-activity",
-        ],
-        "Study/Learning": [
-            "https://en.wikipedia.org/wiki/Spaced_repetition",
-            "https://en.wikipedia.org/wiki/Testing_effect",
-            "https://en.wikipedia.org/wiki/Study_skills",
-        ],
-        "Money/Personal Finance": [
-            "https://en.wikipedia.org/wiki/Personal_finance",
-            "https://en.wikipedia.org/wiki/Budget",
-            "https://en.wikipedia.org/wiki/Interest",
-        ],
-        "Career/Work": [
-            "https://en.wikipedia.org/wiki/Curriculum_vitae",
-            "https://en.wikipedia.org/wiki/Job_interview",
-            "https://en.wikipedia.org/wiki/Cover_letter",
-        ],
-        "Relationships/Communication": [
-            "https://en.wikipedia.org/wiki/Interpersonal_communication",
-            "https://en.wikipedia.org/wiki/Active_listening",
-            "https://en.wikipedia.org/wiki/Nonviolent_communication",
-        ],
-        "Home/Life Admin": [
-            "https://en.wikipedia.org/wiki/Checklist",
-            "https://en.wikipedia.org/wiki/Time_management",
-            "https://en.wikipedia.org/wiki/Personal_organizer",
-        ],
-        "Shopping/Products": [
-            "https://en.wikipedia.org/wiki/Comparison_shopping",
-            "https://en.wikipedia.org/wiki/Product_lifecycle",
-            "https://en.wikipedia.org/wiki/Warranty",
-        ],
-        "Events/Leisure": [
-            "https://en.wikipedia.org/wiki/Event_planning",
-            "https://en.wikipedia.org/wiki/Ticket_(admission)",
-            "https://en.wikipedia.org/wiki/Leisure",
-        ],
-        # tech-ish fallbacks
-        "Dev/Tools": [
-            "https://en.wikipedia.org/wiki/Debugging",
-            "https://en.wikipedia.org/wiki/Software_bug",
-            "https://docs.python.org/3/tutorial/errors.html",
-        ],
-        "Marketing/Social": [
-            "https://en.wikipedia.org/wiki/Search_engine_optimization",
-            "https://en.wikipedia.org/wiki/Digital_marketing",
-            "https://en.wikipedia.org/wiki/Social_media",
-        ],
-        "Business/Accounting/Tax": [
-            "https://en.wikipedia.org/wiki/Accounting",
-            "https://en.wikipedia.org/wiki/Tax",
-            "https://en.wikipedia.org/wiki/Invoice",
-        ],
-        "Images/Design": [
-            "https://en.wikipedia.org/wiki/Raster_graphics",
-            "https://en.wikipedia.org/wiki/Vector_graphics",
-            "https://developer.mozilla.org/en-US/docs/Web/Media/Formats/Image_types",
-        ],
-        "Education/Language": [
-            "https://en.wikipedia.org/wiki/Second-language_acquisition",
-            "https://en.wikipedia.org/wiki/Language_learning",
-            "https://en.wikipedia.org/wiki/Flashcard",
-        ],
-    }
-
-    default = [
-        "https://en.wikipedia.org/wiki/Troubleshooting",
+_SUPP_BY_CATEGORY: Dict[str, Tuple[str, ...]] = {
+    "Web/Hosting": (
+        "https://pages.github.com/",
+        "https://letsencrypt.org/docs/",
+        "https://developer.mozilla.org/en-US/docs/Learn/Common_questions/Web_mechanics/What_is_a_domain_name",
+    ),
+    "Security/Privacy": (
+        "https://owasp.org/www-project-top-ten/",
+        "https://developer.mozilla.org/en-US/docs/Web/HTTP/Cookies",
+        "https://en.wikipedia.org/wiki/Phishing",
+    ),
+    "PDF/Docs": (
+        "https://www.adobe.com/acrobat/resources/what-is-pdf.html",
+        "https://en.wikipedia.org/wiki/PDF",
+        "https://developer.mozilla.org/en-US/docs/Web/API/File",
+    ),
+    "Media": (
+        "https://ffmpeg.org/documentation.html",
+        "https://en.wikipedia.org/wiki/Video_codec",
+        "https://developer.mozilla.org/en-US/docs/Web/Media",
+    ),
+    "Data/Spreadsheets": (
+        "https://support.google.com/docs/?hl=en#topic=1382883",
+        "https://support.microsoft.com/excel",
+        "https://en.wikipedia.org/wiki/Comma-separated_values",
+    ),
+    "AI/Automation": (
+        "https://docs.github.com/en/actions",
+        "https://en.wikipedia.org/wiki/Cron",
+        "https://en.wikipedia.org/wiki/Automation",
+    ),
+    "Travel/Planning": (
+        "https://en.wikipedia.org/wiki/Travel_itinerary",
+        "https://en.wikipedia.org/wiki/Packing_list",
+        "https://www.wikivoyage.org/",
+    ),
+    "Food/Cooking": (
+        "https://en.wikipedia.org/wiki/Meal_preparation",
+        "https://en.wikipedia.org/wiki/Food_safety",
+        "https://www.fda.gov/food",
+    ),
+    "Health/Fitness": (
+        "https://en.wikipedia.org/wiki/Physical_fitness",
+        "https://en.wikipedia.org/wiki/Sleep_hygiene",
+        "https://www.who.int/health-topics/physical-activity",
+    ),
+    "Study/Learning": (
+        "https://en.wikipedia.org/wiki/Spaced_repetition",
+        "https://en.wikipedia.org/wiki/Testing_effect",
+        "https://en.wikipedia.org/wiki/Study_skills",
+    ),
+    "Money/Personal Finance": (
+        "https://en.wikipedia.org/wiki/Personal_finance",
+        "https://en.wikipedia.org/wiki/Budget",
+        "https://en.wikipedia.org/wiki/Interest",
+    ),
+    "Career/Work": (
+        "https://en.wikipedia.org/wiki/Curriculum_vitae",
+        "https://en.wikipedia.org/wiki/Job_interview",
+        "https://en.wikipedia.org/wiki/Cover_letter",
+    ),
+    "Relationships/Communication": (
+        "https://en.wikipedia.org/wiki/Interpersonal_communication",
+        "https://en.wikipedia.org/wiki/Active_listening",
+        "https://en.wikipedia.org/wiki/Nonviolent_communication",
+    ),
+    "Home/Life Admin": (
         "https://en.wikipedia.org/wiki/Checklist",
-        "https://developer.mozilla.org/",
-    ]
-    return (base.get(category) or default)
+        "https://en.wikipedia.org/wiki/Time_management",
+        "https://en.wikipedia.org/wiki/Personal_organizer",
+    ),
+    "Shopping/Products": (
+        "https://en.wikipedia.org/wiki/Comparison_shopping",
+        "https://en.wikipedia.org/wiki/Product_lifecycle",
+        "https://en.wikipedia.org/wiki/Warranty",
+    ),
+    "Events/Leisure": (
+        "https://en.wikipedia.org/wiki/Event_planning",
+        "https://en.wikipedia.org/wiki/Ticket_(admission)",
+        "https://en.wikipedia.org/wiki/Leisure",
+    ),
+    # tech-ish fallbacks
+    "Dev/Tools": (
+        "https://en.wikipedia.org/wiki/Debugging",
+        "https://en.wikipedia.org/wiki/Software_bug",
+        "https://docs.python.org/3/tutorial/errors.html",
+    ),
+    "Marketing/Social": (
+        "https://en.wikipedia.org/wiki/Search_engine_optimization",
+        "https://en.wikipedia.org/wiki/Digital_marketing",
+        "https://en.wikipedia.org/wiki/Social_media",
+    ),
+    "Business/Accounting/Tax": (
+        "https://en.wikipedia.org/wiki/Accounting",
+        "https://en.wikipedia.org/wiki/Tax",
+        "https://en.wikipedia.org/wiki/Invoice",
+    ),
+    "Images/Design": (
+        "https://en.wikipedia.org/wiki/Raster_graphics",
+        "https://en.wikipedia.org/wiki/Vector_graphics",
+        "https://developer.mozilla.org/en-US/docs/Web/Media/Formats/Image_types",
+    ),
+    "Education/Language": (
+        "https://en.wikipedia.org/wiki/Second-language_acquisition",
+        "https://en.wikipedia.org/wiki/Language_learning",
+        "https://en.wikipedia.org/wiki/Flashcard",
+    ),
+}
 
+_SUPP_DEFAULT: Tuple[str, ...] = (
+    "https://en.wikipedia.org/wiki/Troubleshooting",
+    "https://en.wikipedia.org/wiki/Checklist",
+    "https://developer.mozilla.org/",
+)
 
 
+def supplemental_resources_for_category(category: str) -> Tuple[str, ...]:
+    return _SUPP_BY_CATEGORY.get(category) or _SUPP_DEFAULT
+
 
 def pick_reference_urls(theme: Theme) -> List[str]:
     """
@@ -2489,7 +2794,7 @@ def pick_reference_urls(theme: Theme) -> List[str]:
     refs = uniq_keep_order(refs)
     refs = refs[:8]
 
-    supp = supplemental_resources_for_category(theme.category)
+    supp = list(supplemental_resources_for_category(theme.category))
     # mix-in to reach REF_URL_MIN
     extras = [
         "https://support.google.com/webmasters/answer/156184",
@@ -2497,80 +2802,136 @@ def pick_reference_urls(theme: Theme) -> List[str]:
         "https://developer.mozilla.org/en-US/docs/Web/SEO",
         "https://developers.google.com/search/docs/crawling-indexing/robots/intro",
     ]
-    pool = uniq_keep_order(supp + extras)
-    random.shuffle(pool)
+    # stable "shuffle": order by a per-category hash so a theme always gets the same refs
+    # (hash() is salted per process, so use blake2b)
+    salt = f"{theme.category}|".encode("utf-8")
+    pool = sorted(
+        uniq_keep_order(supp + extras),
+        key=lambda u: hashlib.blake2b(salt + u.encode("utf-8"), digest_size=4).digest(),
+    )
 
+    seen = set(refs)
     for u in pool:
         if len(refs) >= REF_URL_MIN:
             break
-        if u not in refs:
+        if u not in seen:
             refs.append(u)
+            seen.add(u)
 
     # cap
     return refs[: clamp(REF_URL_MAX, REF_URL_MIN, 30)]
 
 
-def generate_long_article_ja(theme: Theme) -> str:
+# static sections of generate_long_article_ja
+_ARTICLE_WHY = (
+    "多くのトラブルは、(1)設定の不一致、(2)権限や期限、(3)キャッシュ/反映待ち、"
+    "(4)入力条件の揺れ、のどれかに落ちます。\n"
+    "つまり、この4点を順に潰すだけで“直らない理由”の大半は説明できます。\n"
+)
+
+_ARTICLE_DETAIL = (
+    "大事なのは「最小変更」です。一度に複数箇所をいじると、直ったとしても原因が分からず再発します。\n"
+    "最小変更→検証→記録、を守ると、次回はチェックリストだけで復旧できます。\n"
+)
+
+_ARTICLE_VERIFY = (
+    "【検証のコツ】\n"
+    "- “期待結果”を1文にする（何ができれば成功か）\n"
+    "- 失敗が出たら、入力・環境・時刻・ログをセットで残す\n"
+    "- 直った瞬間に、何を変えたかを1行で書ける状態にする\n"
+    "- 再発防止は“次回3分で復旧できるか”で判断する\n"
+    "これだけで、調査が感情ではなく手順になります。\n"
+)
+
+_ARTICLE_TREE = (
+    "【切り分けの分岐（迷った時用）】\n"
+    "1) 別ブラウザ/別端末でも同じ？\n"
+    "  - はい → サービス/設定/権限側が濃厚\n"
+    "  - いいえ → キャッシュ/拡張機能/端末依存が濃厚\n"
+    "2) 同じ入力・同じ手順で再現する？\n"
+    "  - はい → 原因追跡が可能。ログを増やして一点ずつ潰す\n"
+    "  - いいえ → 入力条件が揺れている。まず再現条件の固定が最優先\n"
+    "この分岐を守るだけで、無駄な試行をかなり減らせます。"
+)
+
+_ARTICLE_PAD = (
+    "【追加メモ】\n"
+    "問題が複雑に見える時ほど、最初に“変えた点”を列挙し、それを一つずつ戻して差分を取ると復旧が早くなります。\n"
+    "ログがない場合は、まずログを作ることが最短ルートです。\n"
+)
+
+
+def _bullet_block(title: str, items: Iterable[str]) -> str:
+    """title line + "- item" lines + trailing newline (one join per section)."""
+    return "\n".join([title, "\n".join([f"- {x}" for x in items]), ""])
+
+
+@lru_cache(maxsize=len(CATEGORIES_22) + 8)
+def _article_frame(category: str) -> Tuple[str, str]:
     """
-    Must be >= MIN_ARTICLE_CHARS_JA chars.
-    Deterministic long form to guarantee volume without OpenAI.
+    Everything in the article except the problem examples, rendered once per category:
+    (intro/why/detail, causes/steps/pitfalls/next/verify/tree).
     """
     intro = (
-        f"このページは「{theme.category}」でよく起きる悩みを、"
+        f"このページは「{category}」でよく起きる悩みを、"
         f"短時間で安全に整理して解決へ進めるためのガイドです。\n"
         "ポイントは“推測で決め打ちしない”こと。再現条件を固定し、"
         "影響範囲が小さい順にチェックするだけで、無駄な試行回数が大きく減ります。\n"
     )
-    why = (
-        "多くのトラブルは、(1)設定の不一致、(2)権限や期限、(3)キャッシュ/反映待ち、"
-        "(4)入力条件の揺れ、のどれかに落ちます。\n"
-        "つまり、この4点を順に潰すだけで“直らない理由”の大半は説明できます。\n"
-    )
-    detail = (
-        "大事なのは「最小変更」です。一度に複数箇所をいじると、直ったとしても原因が分からず再発します。\n"
-        "最小変更→検証→記録、を守ると、次回はチェックリストだけで復旧できます。\n"
-    )
+    head = "\n".join([intro, _ARTICLE_WHY, _ARTICLE_DETAIL])
+    # _ARTICLE_TREE has no trailing newline, so the joined article needs no strip()
+    tail = "\n".join([
+        _bullet_block("【原因のパターン分け】", build_causes(category)),
+        _bullet_block("【手順（チェックリスト）】", build_steps(category)),
+        _bullet_block("【よくある失敗と回避策】", build_pitfalls(category)),
+        _bullet_block("【直らない場合の次の手】", build_next_actions(category)),
+        _ARTICLE_VERIFY,
+        _ARTICLE_TREE,
+    ])
+    return head, tail
 
-    examples = "【このページで扱う悩み一覧（例）】\n" + "\n".join([f"- {p}" for p in theme.problem_list]) + "\n"
-    causes = "【原因のパターン分け】\n" + "\n".join([f"- {c}" for c in build_causes(theme.category)]) + "\n"
-    steps = "【手順（チェックリスト）】\n" + "\n".join([f"- {s}" for s in build_steps(theme.category)]) + "\n"
-    pitfalls = "【よくある失敗と回避策】\n" + "\n".join([f"- {p}" for p in build_pitfalls(theme.category)]) + "\n"
-    nxt = "【直らない場合の次の手】\n" + "\n".join([f"- {n}" for n in build_next_actions(theme.category)]) + "\n"
-
-    verify = (
-        "【検証のコツ】\n"
-        "- “期待結果”を1文にする（何ができれば成功か）\n"
-        "- 失敗が出たら、入力・環境・時刻・ログをセットで残す\n"
-        "- 直った瞬間に、何を変えたかを1行で書ける状態にする\n"
-        "- 再発防止は“次回3分で復旧できるか”で判断する\n"
-        "これだけで、調査が感情ではなく手順になります。\n"
-    )
 
-    tree = (
-        "【切り分けの分岐（迷った時用）】\n"
-        "1) 別ブラウザ/別端末でも同じ？\n"
-        "  - はい → サービス/設定/権限側が濃厚\n"
-        "  - いいえ → キャッシュ/拡張機能/端末依存が濃厚\n"
-        "2) 同じ入力・同じ手順で再現する？\n"
-        "  - はい → 原因追跡が可能。ログを増やして一点ずつ潰す\n"
-        "  - いいえ → 入力条件が揺れている。まず再現条件の固定が最優先\n"
-        "この分岐を守るだけで、無駄な試行をかなり減らせます。\n"
-    )
+def generate_long_article_ja(theme: Theme) -> str:
+    """
+    Must be >= MIN_ARTICLE_CHARS_JA chars.
+    Deterministic long form to guarantee volume without OpenAI.
+    """
+    return _long_article_ja(theme.category, tuple(theme.problem_list))
 
-    body = "\n".join([intro, why, detail, examples, causes, steps, pitfalls, nxt, verify, tree]).strip()
 
-    # pad to guarantee chars
-    if len(body) < MIN_ARTICLE_CHARS_JA:
-        pads: List[str] = []
-        while len(body) + sum(len(x) for x in pads) < MIN_ARTICLE_CHARS_JA + 200:
-            pads.append(
-                "【追加メモ】\n"
-                "問題が複雑に見える時ほど、最初に“変えた点”を列挙し、それを一つずつ戻して差分を取ると復旧が早くなります。\n"
-                "ログがない場合は、まずログを作ることが最短ルートです。\n"
-            )
-        body = body + "\n" + "\n".join(pads)
+@lru_cache(maxsize=256)
+def _long_article_ja(category: str, problems: Tuple[str, ...]) -> str:
+    """Body of generate_long_article_ja; it depends only on category + problem list, so repeats hit the cache."""
+    head, tail = _article_frame(category)
+    body = "\n".join([head, _bullet_block("【このページで扱う悩み一覧（例）】", problems), tail])
 
-    return body.strip()
+    # pad to guarantee chars: enough pads that body + pads reaches MIN + 200 (ceil division)
+    if len(body) < MIN_ARTICLE_CHARS_JA:
+        n_pads = -(-(MIN_ARTICLE_CHARS_JA + 200 - len(body)) // len(_ARTICLE_PAD))
+        # last pad without its trailing newline (what the final strip() used to remove)
+        body = "\n".join([body, *([_ARTICLE_PAD] * (n_pads - 1)), _ARTICLE_PAD[:-1]])
+
+    return body
+
+
+_SHORT_VALUE_BY_CATEGORY: Dict[str, str] = {
+    "Travel/Planning": "Build a clean itinerary + packing checklist in seconds.",
+    "Food/Cooking": "Generate a meal-prep plan + shopping list in seconds.",
+    "Health/Fitness": "Turn your goal into a tiny daily routine + tracker in seconds.",
+    "Study/Learning": "Generate a study plan + spaced-review schedule in seconds.",
+    "Money/Personal Finance": "Make a simple budget + fee checklist in seconds.",
+    "Career/Work": "Turn your notes into resume bullets + interview prompts in seconds.",
+    "Relationships/Communication": "Get short conversation templates (ask/decline/follow-up) in seconds.",
+    "Home/Life Admin": "Create a moving/life-admin checklist in seconds.",
+    "Shopping/Products": "Compare options using 3 criteria + decide fast in seconds.",
+    "Events/Leisure": "Pick a weekend plan (A/B for weather) in seconds.",
+    "Web/Hosting": "Get a DNS/SSL checklist + quick tests in seconds.",
+    "PDF/Docs": "Get a PDF convert/merge checklist in seconds.",
+    "Media": "Get video compression settings + checklist in seconds.",
+    "Data/Spreadsheets": "Get spreadsheet debugging steps + checklist in seconds.",
+    "Security/Privacy": "Get privacy/login troubleshooting checklist in seconds.",
+    "AI/Automation": "Get automation workflow debugging checklist in seconds.",
+}
 
 
 def short_value_line(category: str) -> str:
@@ -2578,25 +2939,7 @@ def short_value_line(category: str) -> str:
     One-line value (for Bluesky post draft).
     Keep it short, concrete, non-spammy.
     """
-    mapping = {
-        "Travel/Planning": "Build a clean itinerary + packing checklist in seconds.",
-        "Food/Cooking": "Generate a meal-prep plan + shopping list in seconds.",
-        "Health/Fitness": "Turn your goal into a tiny daily routine + tracker in seconds.",
-        "Study/Learning": "Generate a study plan + spaced-review schedule in seconds.",
-        "Money/Personal Finance": "Make a simple budget + fee checklist in seconds.",
-        "Career/Work": "Turn your notes into resume bullets + interview prompts in seconds.",
-        "Relationships/Communication": "Get short conversation templates (ask/decline/follow-up) in seconds.",
-        "Home/Life Admin": "Create a moving/life-admin checklist in seconds.",
-        "Shopping/Products": "Compare options using 3 criteria + decide fast in seconds.",
-        "Events/Leisure": "Pick a weekend plan (A/B for weather) in seconds.",
-        "Web/Hosting": "Get a DNS/SSL checklist + quick tests in seconds.",
-        "PDF/Docs": "Get a PDF convert/merge checklist in seconds.",
-        "Media": "Get video compression settings + checklist in seconds.",
-        "Data/Spreadsheets": "Get spreadsheet debugging steps + checklist in seconds.",
-        "Security/Privacy": "Get privacy/login troubleshooting checklist in seconds.",
-        "AI/Automation": "Get automation workflow debugging checklist in seconds.",
-    }
-    return mapping.get(category, "Get a clean checklist + next steps in seconds.")
+    return _SHORT_VALUE_BY_CATEGORY.get(category, "Get a clean checklist + next steps in seconds.")
 
 
 # =============================================================================
@@ -2783,7 +3126,17 @@ def build_tool_ui(theme: Theme) -> str:
 
 
 def html_escape(s: str) -> str:
-    return html.escape(s or "", quote=True)
+    if not s:
+        return ""
+    # most text has none of &<>"' ; five substring checks are far cheaper than
+    # html.escape's five replace() passes (a regex precheck measured slower than either)
+    if "&" in s or "<" in s or ">" in s or '"' in s or "'" in s:
+        return html.escape(s, quote=True)
+    return s
+
+
+# for short strings that repeat across pages (run timestamp etc.); not for article bodies
+_html_escape_cached = lru_cache(maxsize=1024)(html_escape)
 
 
 def render_affiliate_block(affiliate: Dict[str, Any]) -> str:
@@ -2814,140 +3167,18 @@ def fetch_unsplash_bg_url() -> str:
     if st != 200:
         return ""
     try:
-        js = json.loads(body)
+        js = json_loads(body)
         u = ((js.get("urls") or {}).get("regular") or "").strip()
         return u
     except Exception:
         return ""
 
 
-def build_page_html(
-    theme: Theme,
-    tool_url: str,
-    short_url: str,
-    affiliates_top2: List[Dict[str, Any]],
-    references: List[str],
-    supplements: List[str],
-    article_ja: str,
-    faq: List[Tuple[str, str]],
-    related_tools: List[Dict[str, Any]],
-    popular_sites: List[Dict[str, Any]],
-    hero_bg_url: str = "",
-) -> str:
-    problems_html = "\n".join([f"<li class='py-1'>{html_escape(p)}</li>" for p in theme.problem_list])
-
-    quick_answer = build_quick_answer(theme.category, theme.keywords)
-    causes = build_causes(theme.category)
-    steps = build_steps(theme.category)
-    pitfalls = build_pitfalls(theme.category)
-    next_actions = build_next_actions(theme.category)
-
-    causes_html = "\n".join([f"<li class='py-1'>{html_escape(c)}</li>" for c in causes])
-    steps_html = "\n".join([f"<li class='py-1'>{html_escape(s)}</li>" for s in steps])
-    pitfalls_html = "\n".join([f"<li class='py-1'>{html_escape(p)}</li>" for p in pitfalls])
-    next_html = "\n".join([f"<li class='py-1'>{html_escape(n)}</li>" for n in next_actions])
-
-    faq_html = "\n".join([
-        f"""
-        <details class="rounded-2xl border border-white/10 bg-white/5 p-4">
-          <summary class="cursor-pointer font-medium">{html_escape(q)}</summary>
-          <div class="mt-2 text-white/80 leading-relaxed">{html_escape(a)}</div>
-        </details>
-        """.strip()
-        for q, a in faq
-    ])
-
-    ref_html = "\n".join([f"<li class='py-1'><a class='underline break-all' href='{html_escape(u)}' target='_blank' rel='noopener'>{html_escape(u)}</a></li>" for u in references])
-    sup_html = "\n".join([f"<li class='py-1'><a class='underline break-all' href='{html_escape(u)}' target='_blank' rel='noopener'>{html_escape(u)}</a></li>" for u in supplements])
-
-    # affiliates slot: top2
-    aff_blocks = []
-    for a in affiliates_top2[:2]:
-        title = html_escape(a.get("title", "Recommended"))
-        block = render_affiliate_block(a)
-        if not block:
-            continue
-        aff_blocks.append(f"""
-        <div class="rounded-2xl border border-white/10 bg-white/5 p-4">
-          <div class="text-sm text-white/70 mb-2">{title}</div>
-          <div class="prose prose-invert max-w-none">{block}</div>
-        </div>
-        """.strip())
-    if not aff_blocks:
-        aff_blocks = ["""
-        <div class="rounded-2xl border border-white/10 bg-white/5 p-4">
-          <div class="text-sm text-white/70 mb-2">Recommended</div>
-          <div class="text-white/70">No affiliate available for this category.</div>
-        </div>
-        """.strip()]
-    aff_html = "\n".join(aff_blocks)
-
-    related_html = "\n".join([
-        f"<li class='py-1'><a class='underline' href='{html_escape(t.get('url','#'))}'>{html_escape(t.get('title','Tool'))}</a> "
-        f"<span class='text-white/50 text-xs'>({html_escape(t.get('category',''))})</span></li>"
-        for t in related_tools
-    ])
-
-    popular_html = "\n".join([
-        f"<li class='py-1'><a class='underline' href='{html_escape(t.get('url','#'))}'>{html_escape(t.get('title','Tool'))}</a> "
-        f"<span class='text-white/50 text-xs'>({html_escape(t.get('category',''))})</span></li>"
-        for t in popular_sites
-    ])
-
-    canonical = tool_url if tool_url.startswith("http") else (SITE_DOMAIN.rstrip("/") + "/" + theme.slug + "/")
-
-    article_html = "<p class='leading-relaxed whitespace-pre-wrap text-white/85'>" + html_escape(article_ja) + "</p>"
-    try:
-        tool_ui = build_tool_ui(theme)
-    except Exception as e:
-        logging.exception("build_tool_ui failed: %s", e)
-        tool_ui = "<div class='rounded-2xl border border-white/10 bg-white/5 p-4 text-sm text-white/80'>Tool UI rendering failed. Please refresh later.</div>"
-
-
-    # internal linking: ALWAYS provide a path back to /hub/
-    hub_url = SITE_DOMAIN.rstrip("/") + "/hub/"
-
-    # short URL block (for click-through + share)
-    share_script = """
-<script>
-function copyTextFrom(id, btnId){
-  const el = document.getElementById(id);
-  if(!el) return;
-  navigator.clipboard.writeText(el.value).then(()=>{
-    const b = document.getElementById(btnId);
-    if(b){
-      b.textContent = (window.I18N && I18N[document.documentElement.lang] && I18N[document.documentElement.lang].copied) || "Copied";
-    }
-    setTimeout(()=>{
-      const b2 = document.getElementById(btnId);
-      if(b2){
-        b2.textContent = (window.I18N && I18N[document.documentElement.lang] && I18N[document.documentElement.lang].copy) || "Copy";
-      }
-    }, 1200);
-  });
-}
-</script>
-""".strip()
-
-    bg_css = ""
-    if hero_bg_url:
-        bg_css = f"""
-  <div class="pointer-events-none fixed inset-0 opacity-40">
-    <div class="absolute inset-0 bg-cover bg-center" style="background-image:url('{html_escape(hero_bg_url)}')"></div>
-    <div class="absolute inset-0 bg-zinc-950/70"></div>
-  </div>
-        """.strip()
-    else:
-        bg_css = """
-  <div class="pointer-events-none fixed inset-0 opacity-70">
-    <div class="absolute -top-24 -left-24 h-96 w-96 rounded-full bg-gradient-to-br from-indigo-500/35 to-cyan-400/20 blur-3xl"></div>
-    <div class="absolute top-40 -right-24 h-96 w-96 rounded-full bg-gradient-to-br from-emerald-500/25 to-lime-400/10 blur-3xl"></div>
-    <div class="absolute bottom-0 left-1/4 h-96 w-96 rounded-full bg-gradient-to-br from-fuchsia-500/20 to-rose-400/10 blur-3xl"></div>
-  </div>
-        """.strip()
-
-    html_doc = f"""<!doctype html>
-<html lang="{html_escape(DEFAULT_LANG)}">
+# =============================================================================
+# Page template (site constants baked once, category blocks baked per category)
+# =============================================================================
+_PAGE_TEMPLATE = """<!doctype html>
+<html lang="{lang}">
 <head>
 　<!-- ===== Consent / Privacy (必ず最初) ===== -->
 <script data-cfasync="false" src="https://cmp.gatekeeperconsent.com/min.js"></script>
@@ -3003,13 +3234,13 @@ function copyTextFrom(id, btnId){
 <script src="https://quge5.com/88/tag.min.js" data-zone="206389" async data-cfasync="false"></script>
 <script src="https://pl28593834.effectivegatecpm.com/bf/0c/41/bf0c417e61a02af02bb4fab871651c1b.js"></script>
 
-  <title>{html_escape(theme.search_title)} | {html_escape(SITE_BRAND)}</title>
-  <meta name="description" content="{html_escape('One-page fix guide + checklist + tool: ' + theme.search_title)}">
-  <link rel="canonical" href="{html_escape(canonical)}">
-  <meta property="og:title" content="{html_escape(theme.search_title)}">
-  <meta property="og:description" content="{html_escape('Fix guide + checklist + FAQ + references')}">
+  <title>{title} | {brand}</title>
+  <meta name="description" content="{description}">
+  <link rel="canonical" href="{canonical}">
+  <meta property="og:title" content="{title}">
+  <meta property="og:description" content="{og_description}">
   <meta property="og:type" content="website">
-  <meta property="og:url" content="{html_escape(canonical)}">
+  <meta property="og:url" content="{canonical}">
   <meta name="twitter:card" content="summary_large_image">
   <script src="https://cdn.tailwindcss.com"></script>
   <style>
@@ -3049,18 +3280,18 @@ function copyTextFrom(id, btnId){
 
   <header class="relative z-10 mx-auto max-w-6xl px-4 py-6">
     <div class="flex items-center justify-between gap-4">
-      <a href="{html_escape(hub_url)}" class="flex items-center gap-3">
+      <a href="{hub_url}" class="flex items-center gap-3">
         <div class="h-10 w-10 rounded-2xl bg-white/10 border border-white/10 flex items-center justify-center font-bold">🍊</div>
         <div>
-          <div class="font-semibold leading-tight">{html_escape(SITE_BRAND)}</div>
+          <div class="font-semibold leading-tight">{brand}</div>
           <div class="text-xs text-white/60">Hub → categories / popular / new</div>
         </div>
       </a>
 
       <nav class="flex items-center gap-3 text-sm">
-        <a class="text-white/80 hover:text-white" href="{html_escape(hub_url)}" data-i18n="home">Home</a>
-        <a class="text-white/80 hover:text-white" href="{html_escape(hub_url)}#about" data-i18n="about">About Us</a>
-        <a class="text-white/80 hover:text-white" href="{html_escape(hub_url)}#tools" data-i18n="all_tools">All Tools</a>
+        <a class="text-white/80 hover:text-white" href="{hub_url}" data-i18n="home">Home</a>
+        <a class="text-white/80 hover:text-white" href="{hub_url}#about" data-i18n="about">About Us</a>
+        <a class="text-white/80 hover:text-white" href="{hub_url}#tools" data-i18n="all_tools">All Tools</a>
         <select id="langSel" class="ml-2 rounded-xl bg-white/10 border border-white/10 px-2 py-1 text-xs">
           <option value="en">EN</option>
         　<option value="ja">日本語</option>
@@ -3081,10 +3312,10 @@ function copyTextFrom(id, btnId){
     <section class="rounded-3xl border border-white/10 bg-white/5 glass p-6 md:p-8">
       <div class="flex flex-col md:flex-row md:items-start md:justify-between gap-4">
         <div>
-          <h1 class="text-2xl md:text-3xl font-semibold leading-tight">{html_escape(theme.search_title)}</h1>
+          <h1 class="text-2xl md:text-3xl font-semibold leading-tight">{title}</h1>
           <p class="mt-2 text-white/70">
-            Category: <span class="text-white/90">{html_escape(theme.category)}</span> ·
-            Updated: <span class="text-white/90">{html_escape(now_iso())}</span>
+            Category: <span class="text-white/90">{category}</span> ·
+            Updated: <span class="text-white/90">{updated}</span>
           </p>
         </div>
         <div class="rounded-2xl border border-white/10 bg-black/20 p-4 w-full md:w-[360px]">
@@ -3092,13 +3323,13 @@ function copyTextFrom(id, btnId){
           <div class="space-y-2">
             <div class="text-xs text-white/60">Short URL (for posts)</div>
             <div class="flex items-center gap-2">
-              <input id="shortUrl" value="{html_escape(short_url)}" class="w-full rounded-xl bg-black/40 border border-white/10 px-3 py-2 text-xs" readonly>
+              <input id="shortUrl" value="{short_url}" class="w-full rounded-xl bg-black/40 border border-white/10 px-3 py-2 text-xs" readonly>
               <button id="copyBtnShort" class="rounded-xl bg-white/10 border border-white/10 px-3 py-2 text-xs" data-i18n="copy" onclick="copyTextFrom('shortUrl','copyBtnShort')">Copy</button>
             </div>
 
             <div class="text-xs text-white/60">Full URL</div>
             <div class="flex items-center gap-2">
-              <input id="fullUrl" value="{html_escape(tool_url)}" class="w-full rounded-xl bg-black/40 border border-white/10 px-3 py-2 text-xs" readonly>
+              <input id="fullUrl" value="{tool_url}" class="w-full rounded-xl bg-black/40 border border-white/10 px-3 py-2 text-xs" readonly>
               <button id="copyBtnFull" class="rounded-xl bg-white/10 border border-white/10 px-3 py-2 text-xs" data-i18n="copy" onclick="copyTextFrom('fullUrl','copyBtnFull')">Copy</button>
             </div>
           </div>
@@ -3160,7 +3391,7 @@ function copyTextFrom(inputId, btnId) {{
 
         <div class="rounded-3xl border border-white/10 bg-white/5 p-6">
           <h2 class="text-xl font-semibold" data-i18n="quick_answer">Quick answer</h2>
-          <pre class="mt-3 text-white/85 whitespace-pre-wrap leading-relaxed">{html_escape(quick_answer)}</pre>
+          <pre class="mt-3 text-white/85 whitespace-pre-wrap leading-relaxed">{quick_answer}</pre>
         </div>
 
         <div class="rounded-3xl border border-white/10 bg-white/5 p-6">
@@ -3248,56 +3479,360 @@ function copyTextFrom(inputId, btnId) {{
         <div class="flex items-center gap-3">
           <div class="h-10 w-10 rounded-2xl bg-white/10 border border-white/10 flex items-center justify-center font-bold">🍊</div>
           <div>
-            <div class="font-semibold">{html_escape(SITE_BRAND)}</div>
+            <div class="font-semibold">{brand}</div>
             <div class="text-xs text-white/60" data-i18n="footer_note">Practical, fast, and respectful guides—built to reduce wasted trial-and-error.</div>
           </div>
         </div>
-        <div class="mt-3 text-xs text-white/60">Contact: {html_escape(SITE_CONTACT_EMAIL)}</div>
+        <div class="mt-3 text-xs text-white/60">Contact: {contact_email}</div>
       </div>
 
       <div class="text-sm">
         <div class="font-semibold mb-2">Legal</div>
         <ul class="space-y-2 text-white/70">
-          <li><a class="underline" href="{html_escape(SITE_DOMAIN.rstrip('/') + '/policies/privacy.html')}" data-i18n="privacy">Privacy</a></li>
-          <li><a class="underline" href="{html_escape(SITE_DOMAIN.rstrip('/') + '/policies/terms.html')}" data-i18n="terms">Terms</a></li>
-          <li><a class="underline" href="{html_escape(SITE_DOMAIN.rstrip('/') + '/policies/contact.html')}" data-i18n="contact">Contact</a></li>
+          <li><a class="underline" href="{privacy_url}" data-i18n="privacy">Privacy</a></li>
+          <li><a class="underline" href="{terms_url}" data-i18n="terms">Terms</a></li>
+          <li><a class="underline" href="{contact_url}" data-i18n="contact">Contact</a></li>
         </ul>
       </div>
 
       <div class="text-sm">
         <div class="font-semibold mb-2">Hub</div>
         <ul class="space-y-2 text-white/70">
-          <li><a class="underline" href="{html_escape(hub_url)}">/hub/</a></li>
-          <li><a class="underline" href="{html_escape(hub_url)}#tools">All tools</a></li>
+          <li><a class="underline" href="{hub_url}">/hub/</a></li>
+          <li><a class="underline" href="{hub_url}#tools">All tools</a></li>
         </ul>
       </div>
     </div>
   </footer>
 
-  {build_i18n_script(DEFAULT_LANG)}
+  {i18n_script}
   {share_script}
 </body>
 </html>
 """
-    return html_doc
+
+
+def _bake_template(template: str, values: Dict[str, str]) -> str:
+    """
+    Substitute some placeholders now and keep the rest for the final .format().
+    Baked values get their braces doubled so the later .format() leaves them as-is.
+    """
+    for k, v in values.items():
+        template = template.replace("{" + k + "}", v.replace("{", "{{").replace("}", "}}"))
+    return template
+
+
+# short URL block (for click-through + share); identical on every page
+_SHARE_SCRIPT = """
+<script>
+function copyTextFrom(id, btnId){
+  const el = document.getElementById(id);
+  if(!el) return;
+  navigator.clipboard.writeText(el.value).then(()=>{
+    const b = document.getElementById(btnId);
+    if(b){
+      b.textContent = (window.I18N && I18N[document.documentElement.lang] && I18N[document.documentElement.lang].copied) || "Copied";
+    }
+    setTimeout(()=>{
+      const b2 = document.getElementById(btnId);
+      if(b2){
+        b2.textContent = (window.I18N && I18N[document.documentElement.lang] && I18N[document.documentElement.lang].copy) || "Copy";
+      }
+    }, 1200);
+  });
+}
+</script>
+""".strip()
+
+
+# page background: hero image if one was picked, else the gradient blobs
+_BG_CSS_HERO = """
+  <div class="pointer-events-none fixed inset-0 opacity-40">
+    <div class="absolute inset-0 bg-cover bg-center" style="background-image:url('{url}')"></div>
+    <div class="absolute inset-0 bg-zinc-950/70"></div>
+  </div>
+""".strip()
+
+_BG_CSS_DEFAULT = """
+  <div class="pointer-events-none fixed inset-0 opacity-70">
+    <div class="absolute -top-24 -left-24 h-96 w-96 rounded-full bg-gradient-to-br from-indigo-500/35 to-cyan-400/20 blur-3xl"></div>
+    <div class="absolute top-40 -right-24 h-96 w-96 rounded-full bg-gradient-to-br from-emerald-500/25 to-lime-400/10 blur-3xl"></div>
+    <div class="absolute bottom-0 left-1/4 h-96 w-96 rounded-full bg-gradient-to-br from-fuchsia-500/20 to-rose-400/10 blur-3xl"></div>
+  </div>
+""".strip()
+
+
+# internal linking: ALWAYS provide a path back to /hub/
+_SITE_TEMPLATE = _bake_template(_PAGE_TEMPLATE, {
+    "lang": html_escape(DEFAULT_LANG),
+    "brand": html_escape(SITE_BRAND),
+    "og_description": html_escape("Fix guide + checklist + FAQ + references"),
+    "hub_url": html_escape(SITE_DOMAIN.rstrip("/") + "/hub/"),
+    "contact_email": html_escape(SITE_CONTACT_EMAIL),
+    "privacy_url": html_escape(SITE_DOMAIN.rstrip("/") + "/policies/privacy.html"),
+    "terms_url": html_escape(SITE_DOMAIN.rstrip("/") + "/policies/terms.html"),
+    "contact_url": html_escape(SITE_DOMAIN.rstrip("/") + "/policies/contact.html"),
+    "i18n_script": build_i18n_script(DEFAULT_LANG),
+    "share_script": _SHARE_SCRIPT,
+})
+
+
+def _render_li_list(items: Iterable[str]) -> str:
+    """Plain-text bullet items as escaped <li class='py-1'> lines."""
+    return "\n".join(["<li class='py-1'>" + html_escape(x) + "</li>" for x in items])
+
+
+def _build_skeleton_for_category(category: str) -> str:
+    """
+    causes/steps/pitfalls/next actions depend only on the category,
+    so they are rendered once here instead of once per page.
+    """
+    return _bake_template(_SITE_TEMPLATE, {
+        "category": html_escape(category),
+        "causes_html": _render_li_list(build_causes(category)),
+        "steps_html": _render_li_list(build_steps(category)),
+        "pitfalls_html": _render_li_list(build_pitfalls(category)),
+        "next_html": _render_li_list(build_next_actions(category)),
+    })
+
+
+def _compile_template(template: str) -> Tuple[Tuple[str, ...], Tuple[str, ...]]:
+    """
+    Parse a str.format template once into a flat (lit, slot, lit, ..., slot, lit) list
+    plus the field name of each slot. Rendering fills the slots and does one join;
+    the 12KB skeleton is not re-scanned and no lit + value temporaries are built per page.
+    """
+    flat = [""]
+    fields: List[str] = []
+    for lit, field, _spec, _conv in string.Formatter().parse(template):
+        flat[-1] += lit  # parse() splits literals at escaped {{ }}; merge them back
+        if field is not None:
+            fields.append(field)
+            flat += ["", ""]
+    return tuple(flat), tuple(fields)
+
+
+def _render_compiled(compiled: Tuple[Tuple[str, ...], Tuple[str, ...]], ctx: Dict[str, str]) -> str:
+    flat, fields = compiled
+    out = list(flat)
+    out[1::2] = [ctx[f] for f in fields]
+    return "".join(out)
+
+
+_CATEGORY_TEMPLATE: Dict[str, Tuple[Tuple[str, ...], Tuple[str, ...]]] = {
+    cat: _compile_template(_build_skeleton_for_category(cat)) for cat in CATEGORIES_22
+}
+
+
+# Reference / supplement / related / popular lists repeat the same URLs across pages.
+@lru_cache(maxsize=4096)
+def _render_url_li(u: str) -> str:
+    e = html_escape(u)
+    return f"<li class='py-1'><a class='underline break-all' href='{e}' target='_blank' rel='noopener'>{e}</a></li>"
+
+
+@lru_cache(maxsize=4096)
+def _render_tool_li(url: str, title: str, category: str) -> str:
+    return (
+        f"<li class='py-1'><a class='underline' href='{html_escape(url)}'>{html_escape(title)}</a> "
+        f"<span class='text-white/50 text-xs'>({html_escape(category)})</span></li>"
+    )
+
+
+# FAQ sets come from build_faq(category), so pages in one category share the same block.
+@lru_cache(maxsize=256)
+def _render_faq_html(faq: Tuple[Tuple[str, str], ...]) -> str:
+    return "\n".join([
+        f"""
+        <details class="rounded-2xl border border-white/10 bg-white/5 p-4">
+          <summary class="cursor-pointer font-medium">{html_escape(q)}</summary>
+          <div class="mt-2 text-white/80 leading-relaxed">{html_escape(a)}</div>
+        </details>
+        """.strip()
+        for q, a in faq
+    ])
+
+
+def render_article_html(article_ja: str) -> str:
+    return "<p class='leading-relaxed whitespace-pre-wrap text-white/85'>" + html_escape(article_ja) + "</p>"
+
+
+def build_page_context(
+    theme: Theme,
+    tool_url: str,
+    short_url: str,
+    affiliates_top2: List[Dict[str, Any]],
+    references: List[str],
+    supplements: List[str],
+    article_ja: str,
+    faq: List[Tuple[str, str]],
+    related_tools: List[Dict[str, Any]],
+    popular_sites: List[Dict[str, Any]],
+    hero_bg_url: str = "",
+) -> Dict[str, str]:
+    """
+    Rendered fragments for render_page(). The autofix loop in build_sites keeps
+    this dict and only swaps the fragments it changes (article_html).
+    """
+    problems_html = _render_li_list(theme.problem_list)
+
+    quick_answer = build_quick_answer(theme.category, theme.keywords)
+
+    faq_html = _render_faq_html(tuple(faq))
+
+    ref_html = "\n".join(_render_url_li(u) for u in references)
+    sup_html = "\n".join(_render_url_li(u) for u in supplements)
+
+    # affiliates slot: top2
+    aff_blocks = []
+    for a in affiliates_top2[:2]:
+        title = html_escape(a.get("title", "Recommended"))
+        block = render_affiliate_block(a)
+        if not block:
+            continue
+        aff_blocks.append(f"""
+        <div class="rounded-2xl border border-white/10 bg-white/5 p-4">
+          <div class="text-sm text-white/70 mb-2">{title}</div>
+          <div class="prose prose-invert max-w-none">{block}</div>
+        </div>
+        """.strip())
+    if not aff_blocks:
+        aff_blocks = ["""
+        <div class="rounded-2xl border border-white/10 bg-white/5 p-4">
+          <div class="text-sm text-white/70 mb-2">Recommended</div>
+          <div class="text-white/70">No affiliate available for this category.</div>
+        </div>
+        """.strip()]
+    aff_html = "\n".join(aff_blocks)
+
+    related_html = "\n".join(
+        _render_tool_li(t.get("url", "#"), t.get("title", "Tool"), t.get("category", ""))
+        for t in related_tools
+    )
+
+    popular_html = "\n".join(
+        _render_tool_li(t.get("url", "#"), t.get("title", "Tool"), t.get("category", ""))
+        for t in popular_sites
+    )
+
+    canonical = tool_url if tool_url.startswith("http") else (SITE_DOMAIN.rstrip("/") + "/" + theme.slug + "/")
+
+    article_html = render_article_html(article_ja)
+    try:
+        tool_ui = build_tool_ui(theme)
+    except Exception as e:
+        logging.exception("build_tool_ui failed: %s", e)
+        tool_ui = "<div class='rounded-2xl border border-white/10 bg-white/5 p-4 text-sm text-white/80'>Tool UI rendering failed. Please refresh later.</div>"
+
+    bg_css = _BG_CSS_HERO.format(url=html_escape(hero_bg_url)) if hero_bg_url else _BG_CSS_DEFAULT
+
+    # tool_url is normally the canonical url too; escape it once
+    esc_tool_url = html_escape(tool_url)
+    return {
+        "title": html_escape(theme.search_title),
+        "description": html_escape("One-page fix guide + checklist + tool: " + theme.search_title),
+        "canonical": esc_tool_url if canonical is tool_url else html_escape(canonical),
+        "bg_css": bg_css,
+        "updated": _html_escape_cached(run_iso()),
+        "short_url": html_escape(short_url),
+        "tool_url": esc_tool_url,
+        "tool_ui": tool_ui,
+        "problems_html": problems_html,
+        "quick_answer": html_escape(quick_answer),
+        "article_html": article_html,
+        "faq_html": faq_html,
+        "ref_html": ref_html,
+        "sup_html": sup_html,
+        "aff_html": aff_html,
+        "related_html": related_html,
+        "popular_html": popular_html,
+    }
+
+
+def build_page_html(
+    theme: Theme,
+    tool_url: str,
+    short_url: str,
+    affiliates_top2: List[Dict[str, Any]],
+    references: List[str],
+    supplements: List[str],
+    article_ja: str,
+    faq: List[Tuple[str, str]],
+    related_tools: List[Dict[str, Any]],
+    popular_sites: List[Dict[str, Any]],
+    hero_bg_url: str = "",
+) -> str:
+    ctx = build_page_context(
+        theme=theme,
+        tool_url=tool_url,
+        short_url=short_url,
+        affiliates_top2=affiliates_top2,
+        references=references,
+        supplements=supplements,
+        article_ja=article_ja,
+        faq=faq,
+        related_tools=related_tools,
+        popular_sites=popular_sites,
+        hero_bg_url=hero_bg_url,
+    )
+    return render_page(theme.category, ctx)
+
+
+def render_page(category: str, ctx: Dict[str, str]) -> str:
+    compiled = _CATEGORY_TEMPLATE.get(category)
+    if compiled is None:
+        compiled = _CATEGORY_TEMPLATE[category] = _compile_template(_build_skeleton_for_category(category))
+    return _render_compiled(compiled, ctx)
 
 
 # =============================================================================
 # Site building helpers (slug collision safe, related/popular)
 # =============================================================================
-def allocate_unique_slug(base_slug: str) -> str:
+def list_existing_slugs() -> set:
+    """One directory scan of goliath/pages (instead of one stat() per candidate slug)."""
+    try:
+        return set(os.listdir(PAGES_DIR))
+    except FileNotFoundError:
+        return set()
+
+
+def allocate_unique_slug(base_slug: str, existing: Optional[set] = None) -> str:
     """
     No-overwrite rule: if goliath/pages/<slug> exists, use -2, -3...
+    `existing` is the set from list_existing_slugs(); the chosen slug is added to it
+    so later themes in the same run see it as taken.
     """
+    if existing is None:
+        existing = list_existing_slugs()
     base = safe_slug(base_slug)
-    if not os.path.exists(os.path.join(PAGES_DIR, base)):
-        return base
-    for i in range(2, 100):
-        cand = f"{base}-{i}"
-        if not os.path.exists(os.path.join(PAGES_DIR, cand)):
-            return cand
-    # extremely unlikely
-    return f"{base}-{sha1(base)[:6]}"
+    slug = ""
+    if base not in existing:
+        slug = base
+    else:
+        for i in range(2, 100):
+            cand = f"{base}-{i}"
+            if cand not in existing:
+                slug = cand
+                break
+    if not slug:
+        # extremely unlikely
+        slug = f"{base}-{sha1(base)[:6]}"
+    existing.add(slug)
+    return slug
+
+
+def plan_slugs(themes: List[Theme], existing: Optional[set] = None) -> List[str]:
+    """
+    Assign the final slug of every theme up front (sets theme.slug), against one
+    in-memory set of taken names, so the build loop never looks at goliath/pages.
+    """
+    if existing is None:
+        existing = list_existing_slugs()
+    slugs: List[str] = []
+    for t in themes:
+        t.slug = allocate_unique_slug(t.slug, existing)
+        slugs.append(t.slug)
+    return slugs
 
 
 def site_url_for_slug(slug: str) -> str:
@@ -3310,31 +3845,28 @@ def site_url_for_slug(slug: str) -> str:
 
 
 def choose_related_tools(all_sites: List[Dict[str, Any]], category: str, exclude_slug: str, n: int = 5) -> List[Dict[str, Any]]:
-    same = [s for s in all_sites if s.get("category") == category and s.get("slug") != exclude_slug]
-    other = [s for s in all_sites if s.get("slug") != exclude_slug]
-    random.shuffle(same)
-    random.shuffle(other)
-    picks = (same + other)[:n]
+    same: List[Dict[str, Any]] = []
+    other: List[Dict[str, Any]] = []
+    for s in all_sites:
+        if s.get("slug") == exclude_slug:
+            continue
+        (same if s.get("category") == category else other).append(s)
+    # sample only what is needed; other no longer repeats same-category sites
+    picks = random.sample(same, min(n, len(same)))
+    need = n - len(picks)
+    if need > 0 and other:
+        picks += random.sample(other, min(need, len(other)))
     return [{"title": s.get("search_title") or s.get("title", "Tool"), "url": s.get("url", "#"), "category": s.get("category", ""), "slug": s.get("slug", "")} for s in picks]
 
 
 def compute_popular_sites(all_sites: List[Dict[str, Any]], n: int = 6) -> List[Dict[str, Any]]:
     def metric(s: Dict[str, Any]) -> float:
-        for k in ["views", "score", "popularity"]:
-            if k in s:
-                try:
-                    return float(s.get(k, 0))
-                except Exception:
-                    pass
-        iso = s.get("updated_at") or s.get("created_at") or ""
-        try:
-            return dt.datetime.fromisoformat(iso.replace("Z", "+00:00")).timestamp()
-        except Exception:
-            return 0.0
+        pop = _site_pop(s)
+        return _site_ts(s) if pop is None else pop
 
-    sites = list(all_sites)
-    sites.sort(key=lambda x: metric(x), reverse=True)
-    return [{"title": s.get("search_title") or s.get("title", "Tool"), "url": s.get("url", "#"), "category": s.get("category", ""), "slug": s.get("slug", "")} for s in sites[:n]]
+    # key is evaluated once per site; nlargest keeps sorted(reverse=True)[:n] order incl. ties
+    top = heapq.nlargest(n, all_sites, key=metric)
+    return [{"title": s.get("search_title") or s.get("title", "Tool"), "url": s.get("url", "#"), "category": s.get("category", ""), "slug": s.get("slug", "")} for s in top]
 
 
 # =============================================================================
@@ -3500,6 +4032,38 @@ def validate_site_html(html_text: str) -> List[str]:
     return errs
 
 
+def validate_inputs(
+    references: List[str],
+    supplements: List[str],
+    faq: List[Tuple[str, str]],
+    article_ja: str,
+    shell_len: Optional[int] = None,
+    shell_marks: int = 0,
+) -> List[str]:
+    """
+    Checks the page inputs directly instead of re-scanning the rendered HTML.
+    shell_len / shell_marks are the length and 【 count of the rendered page
+    minus its article; when given, the article heuristic of validate_site_html
+    is applied to article_ja alone.
+    """
+    errs: List[str] = []
+    if len(references) < REF_URL_MIN:
+        errs.append("references_below_min")
+    if len(supplements) < SUPP_URL_MIN:
+        errs.append("supplements_below_min")
+    if len(faq) < MIN_FAQ:
+        errs.append("faq_below_min")
+    if len(article_ja) < MIN_ARTICLE_CHARS_JA:
+        errs.append("article_below_min_chars")
+    for u in list(references) + list(supplements):
+        if not urlparse(u).netloc:
+            errs.append(f"bad_url:{u}")
+    if shell_len is not None:
+        if shell_marks + article_ja.count("【") < 6 and shell_len + len(render_article_html(article_ja)) < 12000:
+            errs.append("article_maybe_too_short")
+    return errs
+
+
 # =============================================================================
 # Reply generation (EN, short, no “AI/bot” words, URL last line)
 # =============================================================================
@@ -3538,17 +4102,20 @@ def openai_generate_reply_stub(post: Post, tool_url: str) -> str:
 # Issues output (minimum 100 items; stub fill allowed)
 # =============================================================================
 def make_stub_posts(n: int) -> List[Post]:
-    stubs: List[Post] = []
-    for i in range(n):
-        stubs.append(Post(
+    # everything except the index is shared by the whole batch
+    url_prefix = f"{SITE_DOMAIN.rstrip('/')}/goliath/_out/stub/{RUN_ID}/"
+    created_at = run_iso()
+    return [
+        Post(
             source="stub",
             id=sha1(f"stub:{RUN_ID}:{i}"),
-            url=f"{SITE_DOMAIN.rstrip('/')}/goliath/_out/stub/{RUN_ID}/{i}",
+            url=f"{url_prefix}{i}",
             text="Need a checklist / template for a common problem.",
             author="unknown",
-            created_at=now_iso(),
-        ))
-    return stubs
+            created_at=created_at,
+        )
+        for i in range(n)
+    ]
 
 # FORCE: use ONLY this run's generated site URL for all replies
 RUN_TOOL_URL = None
@@ -3570,18 +4137,10 @@ def build_issue_items(posts: List[Post], post_to_tool_url: Dict[str, str]) -> Li
 
 
 def chunk_issue_bodies(items: List[Dict[str, str]], chunk_size: int = 40) -> List[str]:
-    bodies: List[str] = []
-    for i in range(0, len(items), chunk_size):
-        chunk = items[i:i+chunk_size]
-        lines: List[str] = []
-        for it in chunk:
-            lines.append(f"Problem URL: {it['problem_url']}")
-            lines.append("Reply:")
-            lines.append(it["reply"])
-            lines.append("")  # blank
-            lines.append("---")
-        bodies.append("\n".join(lines).rstrip() + "\n")
-    return bodies
+    # One formatted block per item; every block ends with "---", so the
+    # joined body never has trailing whitespace to strip.
+    blocks = [f"Problem URL: {it['problem_url']}\nReply:\n{it['reply']}\n\n---" for it in items]
+    return ["\n".join(blocks[i:i+chunk_size]) + "\n" for i in range(0, len(blocks), chunk_size)]
 
 
 def write_issues_payload(
@@ -3994,8 +4553,11 @@ def dedup(posts: List["Post"]) -> List["Post"]:
     seen = set()
     for p in posts or []:
         try:
-            url = norm_url(getattr(p, "url", "") or "")
-            key = ("url", url) if url else ("id", getattr(p, "source", ""), getattr(p, "id", ""))
+            if isinstance(p, Post):
+                key = p.dedup_key()
+            else:
+                url = norm_url(getattr(p, "url", "") or "")
+                key = ("url", url) if url else ("id", getattr(p, "source", ""), getattr(p, "id", ""))
         except Exception:
             key = ("raw", repr(p))
         if key in seen:
@@ -4023,15 +4585,21 @@ def collect_all() -> List["Post"]:
     def by_source(posts: List["Post"], source: str) -> List["Post"]:
         return [p for p in posts if getattr(p, "source", None) == source]
 
-    # X MUST be called exactly once per run
-    xx = collect_x_mentions(max_items=X_TARGET)
-
-    # Primary collection
-    bs = collect_bluesky(max_items=BS_TARGET)
-    ms = collect_mastodon(max_items=MS_TARGET)
-    rd = collect_reddit(max_items=RD_TARGET)
-    hn = collect_hn(max_items=HN_TARGET)
-
+    # Primary collection: collectors are network-bound and independent, so run them together
+    # (total wait ~= slowest source instead of the sum). X MUST be called exactly once per run.
+    with ThreadPoolExecutor(max_workers=5) as ex:
+        f_xx = ex.submit(collect_x_mentions, max_items=X_TARGET)
+        f_bs = ex.submit(collect_bluesky, max_items=BS_TARGET)
+        f_ms = ex.submit(collect_mastodon, max_items=MS_TARGET)
+        f_rd = ex.submit(collect_reddit, max_items=RD_TARGET)
+        f_hn = ex.submit(collect_hn, max_items=HN_TARGET)
+    xx = f_xx.result()
+    bs = f_bs.result()
+    ms = f_ms.result()
+    rd = f_rd.result()
+    hn = f_hn.result()
+
+    # keep the serial merge order so dedup keeps the same winners
     all_posts = dedup(bs + ms + rd + xx + hn)
 
     # Top-up (non-X) if per-source targets not met (2 retries)
@@ -4090,8 +4658,11 @@ def choose_themes(posts: List[Post], max_themes: int) -> List[Theme]:
     """
     max_themes = max(1, int(max_themes))
 
+    # tokenize once for all threshold attempts below
+    token_sets = post_token_sets(posts)
+
     # 1) default clustering
-    clusters = cluster_posts(posts, threshold=0.22)
+    clusters = cluster_posts(posts, threshold=0.22, token_sets=token_sets)
     themes = [make_theme(c) for c in clusters if len(c) >= 2]
     themes.sort(key=lambda t: t.score, reverse=True)
     if themes:
@@ -4099,7 +4670,7 @@ def choose_themes(posts: List[Post], max_themes: int) -> List[Theme]:
 
     # 2) relaxed clustering (allow smaller similarity)
     for thr in (0.18, 0.14, 0.10):
-        clusters = cluster_posts(posts, threshold=thr)
+        clusters = cluster_posts(posts, threshold=thr, token_sets=token_sets)
         themes = [make_theme(c) for c in clusters if len(c) >= 2]
         themes.sort(key=lambda t: t.score, reverse=True)
         if themes:
@@ -4111,7 +4682,14 @@ def choose_themes(posts: List[Post], max_themes: int) -> List[Theme]:
     uniq: List[Post] = []
     seen = set()
     for p in posts:
-        pid = p.id or sha1(p.url + "|" + p.text)[:16]
+        if p.id:
+            pid = p.id
+        else:
+            h = hashlib.blake2b(digest_size=12)
+            h.update((p.url or "").encode("utf-8", "ignore"))
+            h.update(b"|")
+            h.update((p.text or "").encode("utf-8", "ignore"))
+            pid = h.digest()
         if pid in seen:
             continue
         seen.add(pid)
@@ -4141,10 +4719,11 @@ def build_sites(themes: List[Theme], aff_norm: Dict[str, List[Dict[str, Any]]],
     # compute popular once from current inventory
     popular_now = compute_popular_sites(all_sites_inventory, n=8)
 
+    # collision-safe slugs for the whole batch, planned in memory
+    plan_slugs(themes, list_existing_slugs())
+
     for theme in themes:
-        # allocate collision-safe slug
-        final_slug = allocate_unique_slug(theme.slug)
-        theme.slug = final_slug
+        final_slug = theme.slug
 
         tool_url = site_url_for_slug(final_slug)
         # remember this run's site url (one site per run)
@@ -4158,14 +4737,14 @@ def build_sites(themes: List[Theme], aff_norm: Dict[str, List[Dict[str, Any]]],
 
         # write shortlink page
         rel_path, short_html = build_shortlink_page(tool_url, code)
-        abs_short_path = os.path.join(REPO_ROOT, rel_path)
-        write_text(abs_short_path, short_html)
+        abs_short_path = f"{REPO_ROOT_PREFIX}{rel_path}"
+        queue_write(abs_short_path, short_html)
 
         # build content
         references = pick_reference_urls(theme)
-        supplements = supplemental_resources_for_category(theme.category)[:max(SUPP_URL_MIN, 3)]
+        supplements = list(supplemental_resources_for_category(theme.category)[:max(SUPP_URL_MIN, 3)])
         article_ja = generate_long_article_ja(theme)
-        faq = build_faq(theme.category)
+        faq = list(build_faq(theme.category))
 
         # affiliates top2
         aff_top2 = pick_affiliates_for_category(aff_norm, theme.category, topn=2)
@@ -4174,8 +4753,8 @@ def build_sites(themes: List[Theme], aff_norm: Dict[str, List[Dict[str, Any]]],
         inventory_for_related = all_sites_inventory + new_inventory_entries
         related = choose_related_tools(inventory_for_related, theme.category, exclude_slug=final_slug, n=5)
 
-        # build html
-        html_text = build_page_html(
+        # build html (keep the fragments so autofix only re-renders what it changes)
+        page_ctx = build_page_context(
             theme=theme,
             tool_url=tool_url,
             short_url=short_url,
@@ -4188,38 +4767,37 @@ def build_sites(themes: List[Theme], aff_norm: Dict[str, List[Dict[str, Any]]],
             popular_sites=popular_now,
             hero_bg_url=hero_bg_url,
         )
+        html_text = render_page(theme.category, page_ctx)
 
         # validate/autofix
-        attempts = 0
         errs = validate_site_html(html_text)
-        while errs and attempts < MAX_AUTOFIX:
-            attempts += 1
-            # simple autofix: pad article, ensure markers
-            if "article_maybe_too_short" in errs:
+        if "article_maybe_too_short" in errs:
+            # only the article changes between attempts, so check it against the
+            # fixed rest of the page instead of re-rendering and re-scanning
+            shell_len = len(html_text) - len(page_ctx["article_html"])
+            shell_marks = html_text.count("【") - article_ja.count("【")
+            attempts = 0
+            while attempts < MAX_AUTOFIX and "article_maybe_too_short" in validate_inputs(
+                references, supplements, faq, article_ja, shell_len=shell_len, shell_marks=shell_marks
+            ):
+                attempts += 1
+                # simple autofix: pad article
                 article_ja = article_ja + "\n" + ("【追加メモ】\n" + "確認→最小変更→検証→記録、の順番を崩さないことが最短です。\n") * 8
-            # rebuild html after pad
-            html_text = build_page_html(
-                theme=theme,
-                tool_url=tool_url,
-                short_url=short_url,
-                affiliates_top2=aff_top2,
-                references=references,
-                supplements=supplements,
-                article_ja=article_ja,
-                faq=faq,
-                related_tools=related,
-                popular_sites=popular_now,
-                hero_bg_url=hero_bg_url,
-            )
-            errs = validate_site_html(html_text)
+            # nothing was padded (MAX_AUTOFIX=0): the page we already have is final
+            if attempts:
+                page_ctx["article_html"] = render_article_html(article_ja)
+                html_text = render_page(theme.category, page_ctx)
+                errs = validate_site_html(html_text)
+        input_errs = validate_inputs(references, supplements, faq, article_ja)
+        if input_errs:
+            logging.warning("Site inputs below minimum for %s: %s", final_slug, input_errs)
 
         if errs:
             logging.warning("Site validation still has errors for %s: %s", final_slug, errs)
 
         # write file
-        out_dir = os.path.join(PAGES_DIR, final_slug)
-        out_path = os.path.join(out_dir, "index.html")
-        write_text(out_path, html_text)
+        out_path = f"{PAGES_DIR_PREFIX}{final_slug}{os.sep}index.html"
+        queue_write(out_path, html_text)
 
         # sitemap urls
         sitemap_urls.append(tool_url)
@@ -4233,8 +4811,8 @@ def build_sites(themes: List[Theme], aff_norm: Dict[str, List[Dict[str, Any]]],
             "category": theme.category,
             "url": tool_url,
             "short_url": short_url,
-            "created_at": now_iso(),
-            "updated_at": now_iso(),
+            "created_at": run_iso(),
+            "updated_at": run_iso(),
             "keywords": theme.keywords[:12],
         }
         new_inventory_entries.append(entry)
@@ -4245,6 +4823,9 @@ def build_sites(themes: List[Theme], aff_norm: Dict[str, List[Dict[str, Any]]],
 
         logging.info("Built site: %s (%s) short=%s", tool_url, theme.category, short_url)
 
+    written = flush_pending_writes()
+    logging.info("Wrote %d page files", written)
+
     return themes, new_inventory_entries, post_to_tool_url, sitemap_urls
 
 
@@ -4284,7 +4865,7 @@ def write_run_summary(
         "affiliates_audit": aff_audit,
         "sitemap_url": sitemap_url_written,
         "post_drafts": post_drafts,
-        "updated_at": now_iso(),
+        "updated_at": run_iso(),
     }
     out_path = os.path.join(OUT_DIR, f"run_summary_{RUN_ID}.json")
     write_json(out_path, summary)
@@ -4297,6 +4878,8 @@ def write_run_summary(
 
 
 def main() -> int:
+    global RUN_TIMESTAMP
+    RUN_TIMESTAMP = now_iso()
     setup_logging()
     # legal pages
     policy_urls = ensure_policies()
@@ -4327,7 +4910,7 @@ def main() -> int:
             url=HUB_BASE_URL.rstrip("/"),
             text="seed: no posts collected this run",
             author="system",
-            created_at=now_iso(),
+            created_at=run_iso(),
         )
         themes = [make_theme([seed_post])]
         logging.info("Chosen themes forced=1 (seed)")
@@ -4351,10 +4934,12 @@ def main() -> int:
     )
 
 
-    # URLs of sites generated in this run (for the workflow Issue)
-    generated_urls = uniq_keep_order([
-        site_url_for_slug(t.slug) for t in built_themes if getattr(t, "slug", "")
-    ])
+    # URLs of sites generated in this run (for the workflow Issue).
+    # build_sites returns one inventory entry per built theme, in order, and
+    # each entry already carries its url.
+    built_urls = [e["url"] for t, e in zip(built_themes, new_entries) if getattr(t, "slug", "")]
+    generated_urls = uniq_keep_order(built_urls)
+    fill_urls = built_urls or [SITE_DOMAIN.rstrip("/") + "/hub/"]
 
     # update hub/sites.json ONLY
     merged_sites = existing_sites + new_entries
@@ -4375,9 +4960,8 @@ def main() -> int:
         need = LEADS_TOTAL - len(mapped_posts)
         stubs = make_stub_posts(need)
 
-        built_urls = [site_url_for_slug(t.slug) for t in built_themes] or [SITE_DOMAIN.rstrip("/") + "/hub/"]
         for i, sp in enumerate(stubs):
-            post_to_tool_url[sp.id] = built_urls[i % len(built_urls)]
+            post_to_tool_url[sp.id] = fill_urls[i % len(fill_urls)]
 
         mapped_posts.extend(stubs)
 
@@ -4403,34 +4987,32 @@ def main() -> int:
     if len(issue_items) < 100:
         more_need = 100 - len(issue_items)
         extra_stubs = make_stub_posts(more_need)
-        built_urls = [site_url_for_slug(t.slug) for t in built_themes] or [SITE_DOMAIN.rstrip("/") + "/hub/"]
         for i, sp in enumerate(extra_stubs):
-            post_to_tool_url[sp.id] = built_urls[i % len(built_urls)]
+            post_to_tool_url[sp.id] = fill_urls[i % len(fill_urls)]
         issue_items.extend(build_issue_items(extra_stubs, post_to_tool_url))
         #今回issueに載せた人を記録（次回以降7日避ける）
-    now_s = now_iso()
+    now_s = run_iso()
     _added = update_recent_authors_from_issue_items(issue_items, authors_map, now_s)
     recent_authors["authors"] = purge_recent_authors(
         authors_map, keep_days=max(30, ISSUE_AUTHOR_COOLDOWN_DAYS * 4)
     )
     save_recent_authors(recent_authors)
 
-    notes = []
-    notes.append(f"Run: {RUN_ID}")
-    notes.append(
+    extra_notes = (
+        f"Run: {RUN_ID}\n"
         f"Collected: Bluesky={counts['Bluesky']} Mastodon={counts['Mastodon']} "
-        f"Reddit={counts['Reddit']} X={counts['X']} HN={counts['HN']} Total={counts['Total']}"
+        f"Reddit={counts['Reddit']} X={counts['X']} HN={counts['HN']} Total={counts['Total']}\n"
+        f"Reply candidates: {len(issue_items)}"
     )
-    notes.append(f"Reply candidates: {len(issue_items)}")
     if not aff_audit.get("ok"):
-        notes.append("Affiliates audit: MISSING keys in affiliates.json:")
-        for k in aff_audit.get("missing", []):
-            notes.append(f"- {k}")
+        extra_notes += "\nAffiliates audit: MISSING keys in affiliates.json:" + "".join(
+            f"\n- {k}" for k in aff_audit.get("missing", [])
+        )
     if aff_audit.get("extra"):
-        notes.append("Affiliates audit: EXTRA keys (ignored):")
-        for k in aff_audit.get("extra", []):
-            notes.append(f"- {k}")
-    extra_notes = "\n".join(notes).strip()
+        extra_notes += "\nAffiliates audit: EXTRA keys (ignored):" + "".join(
+            f"\n- {k}" for k in aff_audit.get("extra", [])
+        )
+    extra_notes = extra_notes.strip()
 
     issues_path = write_issues_payload(issue_items, extra_notes=extra_notes, generated_urls=generated_urls)
     # ✅ B) 今回使った author を state に保存（次回以降 7日避けるため）
@@ -4476,7 +5058,7 @@ def main() -> int:
     drafts = build_post_drafts(built_themes)
     write_json(
         os.path.join(OUT_DIR, f"post_drafts_{RUN_ID}.json"),
-        {"run_id": RUN_ID, "created_at": now_iso(), "drafts": drafts},
+        {"run_id": RUN_ID, "created_at": run_iso(), "drafts": drafts},
     )
 
     # sitemap + robots